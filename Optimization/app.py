@@ -1,19 +1,40 @@
 # app.py
-from flask import Flask, request, jsonify
-from data_handler import DataHandler
-from models.MDVRP import MDVRPHeterogeneous
-from models.tp import transportationProblem
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
+from data_handler import DataHandler, SCENARIO_LIST_KEY
+from scenario_repository import ScenarioRepository
+from solution_store import SolutionStore, input_hash
+from csv_import import import_scenario, DEFAULT_CHUNK_SIZE
+from matrix_io import read_solver_request, matrix_shape_error
+from solver_pool import SolverPool, solve_mdvrp_job, solve_tp_job, repair_mdvrp_job, precheck_mdvrp_job
 from flask_cors import CORS
+from profiling import profiled, job_runner, list_profiles, profile_path, profile_report
 import datetime
-from utilities import *
+import hmac
+import io
+import json
+import time
+from utilities import customer_row_to_dict, transform_demand, transform_supply
 import os
 
 
 
 app = Flask(__name__)
-CORS(app) 
+CORS(app, expose_headers=["ETag", "X-Next-After-Id"])
 
-db = DataHandler(os.path.join(os.path.dirname(__file__), "../data/data.db"))
+db = DataHandler(os.environ.get("DATABASE_PATH", os.path.join(os.path.dirname(__file__), "../data/data.db")))
+scenario_repo = ScenarioRepository(db, max_size=int(os.environ.get("SCENARIO_CACHE_SIZE", 128)))
+
+# Solves run in pre-warmed worker processes; the API never imports pulp
+solver_pool = SolverPool()
+# Same as solver_pool.run, profiling the job in its worker when the request is profiled
+run_solver = job_runner(solver_pool)
+
+# Stored plans per scenario: history, warm starts and incremental repairs
+solution_store = SolutionStore(db)
+INCREMENTAL_MAX_DEGRADATION = float(os.environ.get("INCREMENTAL_MAX_DEGRADATION", 0.15))
+
+# MILPs with more arcs than this are flagged for a heuristic by /mdvrp/precheck
+PRECHECK_MAX_ARCS = int(os.environ.get("PRECHECK_MAX_ARCS", 50000))
  
 def get_current_date():
     now = datetime.datetime.now()
@@ -22,6 +43,72 @@ def get_current_date():
 def get_id():
     return datetime.datetime.now().strftime("%Y%m%d%H%M%S")
 
+def conditional_json(etag, build):
+    """
+    Answer 304 when the client's If-None-Match already holds `etag`,
+    otherwise jsonify build() and tag the response.
+    """
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    return response
+
+MAX_PAGE_SIZE = 10000
+NDJSON_CHUNK = 500
+
+def int_arg(name):
+    value = request.args.get(name)
+    return int(value) if value is not None else None
+
+def wants_stream():
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    return "application/x-ndjson" in request.headers.get("Accept", "")
+
+def list_rows(table, serialize):
+    """
+    Shared GET handler for the row tables.
+    - no paging args: the full list, as before
+    - ?limit=&after_id=: one keyset page, next cursor in the X-Next-After-Id header
+    - ?stream=1 or Accept: application/x-ndjson: one JSON row per line, read from a cursor;
+      ?after_id= resumes a stream after the last row received
+    All modes accept an optional ?scenario_id= filter.
+    """
+    try:
+        scenario_id = int_arg("scenario_id")
+        after_id = int_arg("after_id")
+        limit = int_arg("limit")
+    except ValueError:
+        return jsonify({"error": "Invalid scenario_id, after_id or limit"}), 400
+
+    if wants_stream():
+        def generate():
+            lines = []
+            for row in db.iter_rows(table, scenario_id, after_id=after_id):
+                lines.append(json.dumps(serialize(row)))
+                if len(lines) >= NDJSON_CHUNK:
+                    yield "\n".join(lines) + "\n"
+                    lines = []
+            if lines:
+                yield "\n".join(lines) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    if limit is not None or after_id is not None:
+        limit = MAX_PAGE_SIZE if limit is None else min(max(limit, 1), MAX_PAGE_SIZE)
+        rows = db.get_page(table, limit, after_id, scenario_id)
+        response = jsonify([serialize(row) for row in rows])
+        if len(rows) == limit:
+            response.headers["X-Next-After-Id"] = str(rows[-1][0])
+        return response, 200
+
+    if scenario_id is not None:
+        rows = db.get_all_by_scenario_id(table, scenario_id)
+    else:
+        rows = db.get_all(table)
+    return jsonify([serialize(row) for row in rows]), 200
+
 # ---------------- Scenarios ---------------- #
 
 @app.route("/")
@@ -29,9 +116,12 @@ def home():
     return "Route Optimization API is running 🚀"
 
 @app.route("/scenarios", methods=["GET"])
+@profiled
 def get_scenarios():
-    scenarios = db.get_all("scenarios")
-    return jsonify([{"id":s[0], "name":s[1], "date":s[2]} for s in scenarios])
+    etag = f"scenarios-{db.get_version(SCENARIO_LIST_KEY)}"
+    return conditional_json(etag, lambda: [
+        {"id":s[0], "name":s[1], "date":s[2]} for s in db.get_all("scenarios")
+    ])
 
 @app.route("/scenarios", methods=["DELETE"])
 def delete_scenario():
@@ -45,6 +135,7 @@ def delete_scenario():
         db.delete_by_id("depots", scenario_id, column="scenario_id")
         db.delete_by_id("vehicles", scenario_id, column="scenario_id")
         db.delete_by_id("customers", scenario_id, column="scenario_id")
+        solution_store.delete_for_scenario(scenario_id)
         db.delete_by_id("scenarios", scenario_id)
 
         return jsonify({"status": "success"}), 200
@@ -73,6 +164,7 @@ def change_name():
     
 
 @app.route("/scenarios/full", methods=["POST"])
+@profiled
 def add_full_scenario():
     try:
         data = request.get_json()
@@ -135,71 +227,61 @@ def add_full_scenario():
         print("SERVER ERROR:", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route("/scenarios_by_id", methods=["POST"])
+@app.route("/scenarios/import", methods=["POST"])
+@profiled
+def import_scenario_csv():
+    """
+    Multipart upload of depots, customers and/or vehicles CSV files (same
+    layouts as data/*.csv) plus an optional name, date and chunk_size form field.
+    Files are parsed as a stream and inserted chunk by chunk.
+    """
+    try:
+        streams = {}
+        for table in ("depots", "customers", "vehicles"):
+            upload = request.files.get(table)
+            if upload is not None:
+                streams[table] = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        if not streams:
+            return jsonify({"error": "No CSV files received"}), 400
+
+        result = import_scenario(
+            db,
+            request.form.get("name", "Imported Scenario"),
+            date=request.form.get("date"),
+            chunk_size=int(request.form.get("chunk_size", DEFAULT_CHUNK_SIZE)),
+            **streams
+        )
+        return jsonify({"status": "success", "scenario": result}), 201
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("SERVER ERROR:", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/scenarios_by_id", methods=["GET", "POST"])
+@profiled
 def get_scenarios_by_id():
     try:
-        data = request.get_json(force=True)
-        scenario_id = data.get("scenario_id")
+        if request.method == "GET":
+            scenario_id = request.args.get("scenario_id")
+        else:
+            data = request.get_json(force=True)
+            scenario_id = data.get("scenario_id")
 
         if scenario_id is None:
             return jsonify({"error": "Missing scenario_id"}), 400
 
         scenario_id = int(scenario_id)
+        etag = f"scenario-{scenario_id}-{db.get_version(scenario_id)}"
+        if etag in request.if_none_match:
+            return conditional_json(etag, None)
 
-        scenario_row = db.get_by_id("scenarios", scenario_id)
-        if not scenario_row:
+        scenario = scenario_repo.get(scenario_id)
+        if scenario is None:
             return jsonify({"error": "Scenario not found"}), 404
 
-        _, name, date = scenario_row
-
-        raw_customers = db.get_all_by_scenario_id("customers", scenario_id)
-        raw_vehicles = db.get_all_by_scenario_id("vehicles", scenario_id)
-        raw_depots = db.get_all_by_scenario_id("depots", scenario_id)
-
-        customers = [
-            {
-                "id": row[0],
-                "scenario_id": row[1],
-                "customer_name": row[2],
-                "customer_x": row[3],
-                "customer_y": row[4],
-                "demand": row[5]
-            }
-            for row in raw_customers
-        ]
-
-        vehicles = [
-            {
-                "id": row[0],
-                "scenario_id": row[1],
-                "capacity": row[2],
-                "depot_id": row[3]
-            }
-            for row in raw_vehicles
-        ]
-
-        depots = [
-            {
-                "id": row[0],
-                "scenario_id": row[1],
-                "depot_name": row[2],
-                "depot_x": row[3],
-                "depot_y": row[4],
-                "capacity": row[5],
-                "max_distance": row[6],
-                "type": row[7]
-            }
-            for row in raw_depots
-        ]
-
-        return jsonify({
-            "scenario_id": scenario_id,
-            "name": name,
-            "date": date,
-            "customers": customers,
-            "vehicles": vehicles,
-            "depots": depots
-        })
+        return conditional_json(etag, scenario.to_dict)
 
     except ValueError:
         return jsonify({"error": "Invalid scenario_id"}), 400
@@ -213,17 +295,7 @@ def get_scenarios_by_id():
 
 @app.route("/depots", methods=["GET"])
 def get_depots():
-    scenario_id = request.args.get("scenario_id")
-    if scenario_id is not None:
-        try:
-            scenario_id = int(scenario_id)
-            depots = db.get_all_by_scenario_id("depots", scenario_id)
-        except ValueError:
-            return jsonify({"error": "Invalid scenario_id"}), 400
-    else:
-        depots = db.get_all("depots")
-
-    return jsonify(depots)
+    return list_rows("depots", list)
 
 @app.route("/depots", methods=["POST"])
 def add_depot():
@@ -276,19 +348,7 @@ def delete_depot():
 @app.route("/customers", methods=["GET"])
 def get_customers():
     try:
-        raw_customers = db.get_all("customers")
-        customers = [
-            {
-                "id": row[0],
-                "scenario_id": row[1],
-                "customer_name": row[2],
-                "customer_x": row[3],
-                "customer_y": row[4],
-                "demand": row[5]
-            }
-            for row in raw_customers
-        ]
-        return jsonify(customers), 200
+        return list_rows("customers", customer_row_to_dict)
     except Exception as e:
         print("SERVER ERROR:", e)
         return jsonify({"error": str(e)}), 500
@@ -344,8 +404,7 @@ def delete_customer():
 
 @app.route("/vehicles", methods=["GET"])
 def get_vehicles():
-    vehicles = db.get_all("vehicles")
-    return jsonify(vehicles)
+    return list_rows("vehicles", list)
 
 
 @app.route("/vehicles", methods=["POST"])
@@ -389,11 +448,8 @@ def delete_vehicle():
 @app.route("/reset-database", methods=["POST"])
 def reset_database():
     try:
-        db.cursor.execute("DELETE FROM customers")
-        db.cursor.execute("DELETE FROM vehicles")
-        db.cursor.execute("DELETE FROM depots")
-        db.cursor.execute("DELETE FROM scenarios")
-        db.connection.commit()
+        for table in ("solutions", "cost_matrices", "customers", "vehicles", "depots", "scenarios"):
+            db.clear_table(table)
         return jsonify({"status": "success", "message": "Database cleared"}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -402,68 +458,358 @@ def reset_database():
 # ---------------- Solvers ---------------- #
 
 @app.route("/mdvrp", methods=["POST"])
+@profiled
 def solve_mdvrp():
+    """
+    Solve from the uploaded depots/customers/vehicles, or, with
+    ?scenario_id=, from the cached scenario.
+    Distances come from costMatrix (JSON, .npy upload or raw binary body, see
+    matrix_io), or from distance_engine when distanceMode is "planar",
+    "haversine" or "road". In scenario mode without a costMatrix the mode
+    defaults to "planar", the latest stored plan is the warm start and the
+    result is stored (its id is returned as solution_id).
+    """
     try:
-        data = request.get_json(force=True)
-        depots = data.get("depots", [])
-        customers = data.get("customers", [])
-        vehicles = data.get("vehicles", [])
-        cost_matrix = data.get("costMatrix", [])
-
-        # Clean depot and customer names
-        depot_names = [d["depot_name"].strip() for d in depots]
-        customer_names = [c["customer_name"].strip() for c in customers]
+        started = time.perf_counter()
+        data, cost_matrix = read_solver_request(request)
+        scenario_id = request.args.get("scenario_id")
+        distance_mode = data.get("distanceMode") or request.args.get("distanceMode")
+
+        if scenario_id is not None:
+            scenario = scenario_repo.get(int(scenario_id))
+            if scenario is None:
+                return jsonify({"error": "Scenario not found"}), 404
+            depots = scenario.depot_dicts()
+            customers = scenario.customer_dicts()
+            vehicles = scenario.vehicle_dicts()
+            if cost_matrix is None and distance_mode is None:
+                distance_mode = "planar"
+        else:
+            depots = data.get("depots", [])
+            customers = data.get("customers", [])
+            vehicles = data.get("vehicles", [])
+            if cost_matrix is None:
+                cost_matrix = []
+        if distance_mode is None:
+            shape_error = matrix_shape_error(cost_matrix, len(depots), len(customers))
+            if shape_error:
+                return jsonify({"error": shape_error}), 400
+
+        previous = solution_store.latest(scenario) if scenario_id is not None else None
+        initial_routes = previous["routes"] if previous is not None else None
+
+        solve_started = time.perf_counter()
+        result = run_solver(solve_mdvrp_job, depots, customers, vehicles, cost_matrix, distance_mode,
+                            None, initial_routes)
+        solve_ms = round((time.perf_counter() - solve_started) * 1000, 1)
+        if scenario_id is not None:
+            result["solution_id"] = store_solution(
+                scenario, "mdvrp", result, "full", (depots, customers, vehicles),
+                cost_matrix, distance_mode, solve_ms, started,
+            )
 
-        # Build demands dict
-        demands = {c["customer_name"].strip(): c["demand"] for c in customers}
-
-        # Build vehicles dict
-        vehicles_dict = build_vehicles_dict(vehicles, depots)
+        return jsonify(result), 200
 
-        # Build distance matrix
-        distance_matrix = build_distance_matrix(depots, customers, cost_matrix)
+    except Exception as e:
+        print("SERVER ERROR:", e)
+        return jsonify({"error": str(e)}), 500
+    
+def store_solution(scenario, problem, result, solver_mode, inputs, cost_matrix, distance_mode, solve_ms, started):
+    """
+    Save a scenario-mode result in the solutions table and return its id.
+    A failed save is logged and does not fail the request.
+    """
+    try:
+        return solution_store.save(
+            scenario, problem, result, solver_mode,
+            distance_mode=distance_mode,
+            cost_matrix=cost_matrix,
+            timings={"solve_ms": solve_ms, "total_ms": round((time.perf_counter() - started) * 1000, 1)},
+            input_hash=input_hash(problem, *inputs, distance_mode, cost_matrix),
+        )
+    except Exception as e:
+        print("SOLUTION STORE ERROR:", e)
+        return None
+
+@app.route("/mdvrp/incremental", methods=["POST"])
+@profiled
+def solve_mdvrp_incremental():
+    """
+    Update the latest stored plan of a scenario after customers were added,
+    removed or changed demand, by local repair instead of a re-solve.
+    Falls back to a full solve when there is no previous plan or the repaired
+    plan degrades by more than max_degradation (default
+    INCREMENTAL_MAX_DEGRADATION). Distances are taken as for the previous solve
+    unless the request sends distanceMode or costMatrix (encoded as for
+    /mdvrp); a stored costMatrix that no longer fits the scenario's depots and
+    customers is rejected. Road-mode repairs run on the solver pool.
+    """
+    try:
+        request_started = time.perf_counter()
+        data, cost_matrix = read_solver_request(request)
+        scenario_id = data.get("scenario_id", request.args.get("scenario_id"))
+        if scenario_id is None:
+            return jsonify({"error": "Missing scenario_id"}), 400
+        scenario_id = int(scenario_id)
 
-        # ---------------- Debug ---------------- #
-        print("Depot names:", depot_names)
-        print("Customer names:", customer_names)
-        print("Demands:", demands)
-        print("Vehicles dict:", vehicles_dict)
-        print("Distance matrix sample:", distance_matrix)
-        # -------------------------------------- #
+        scenario = scenario_repo.get(scenario_id)
+        if scenario is None:
+            return jsonify({"error": "Scenario not found"}), 404
+        depots = scenario.depot_dicts()
+        customers = scenario.customer_dicts()
+        vehicles = scenario.vehicle_dicts()
+
+        previous = solution_store.latest(scenario)
+        distance_mode = data.get("distanceMode") or request.args.get("distanceMode")
+        stored_matrix = False
+        if cost_matrix is None and distance_mode is None:
+            if previous is not None:
+                cost_matrix, distance_mode = solution_store.cost_matrix(previous), previous["distance_mode"]
+                stored_matrix = cost_matrix is not None
+            if cost_matrix is None and distance_mode is None:
+                distance_mode = "planar"
+        shape_error = None if distance_mode is not None else \
+            matrix_shape_error(cost_matrix, len(depots), len(customers))
+        if shape_error:
+            # A stored matrix goes stale once customers are added or removed
+            if stored_matrix:
+                shape_error = f"The stored costMatrix of the previous solve no longer fits: {shape_error}"
+            return jsonify({"error": f"{shape_error}; send a current costMatrix or a distanceMode"}), 400
+        max_degradation = float(data.get("max_degradation",
+                                         request.args.get("max_degradation", INCREMENTAL_MAX_DEGRADATION)))
+
+        started = time.perf_counter()
+        result = None
+        if previous is not None:
+            repair_args = (previous, depots, customers, vehicles, cost_matrix, distance_mode, max_degradation)
+            if distance_mode == "road":
+                # Road distances need the road graph, which only the solver workers keep loaded
+                result = run_solver(repair_mdvrp_job, *repair_args)
+            else:
+                result = repair_mdvrp_job(*repair_args)
+            result["mode"] = "incremental"
+
+        if result is None or result["needs_full_solve"]:
+            full = run_solver(solve_mdvrp_job, depots, customers, vehicles, cost_matrix, distance_mode,
+                              None, previous["routes"] if previous is not None else None)
+            previous_cost = previous["total_cost"] if previous is not None else None
+            full["mode"] = "full"
+            full["cost_delta"] = None if previous_cost is None or full["total_cost"] is None \
+                else full["total_cost"] - previous_cost
+            if result is not None:
+                full["repair"] = {k: result[k] for k in ("total_cost", "degradation", "changes", "violations")}
+            result = full
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["solution_id"] = store_solution(
+            scenario, "mdvrp", result, result["mode"], (depots, customers, vehicles),
+            cost_matrix, distance_mode, result["elapsed_ms"], request_started,
+        )
+        return jsonify(result), 200
 
-        # Solve MDVRP
-        problem = MDVRPHeterogeneous(distance_matrix, depot_names, customer_names, demands, vehicles_dict)
-        result = problem.solve()
+    except Exception as e:
+        print("SERVER ERROR:", e)
+        return jsonify({"error": str(e)}), 500
 
+@app.route("/mdvrp/precheck", methods=["POST"])
+@profiled
+def precheck_mdvrp():
+    """
+    Feasibility diagnostics and a lower bound for a /mdvrp request, computed
+    in milliseconds without building the MILP. Takes the same inputs as
+    /mdvrp. "recommendation" is "reject" (infeasible), "heuristic" (model
+    larger than PRECHECK_MAX_ARCS) or "solve". With distanceMode=road the
+    check runs on the solver pool.
+    """
+    try:
+        data, cost_matrix = read_solver_request(request)
+        scenario_id = request.args.get("scenario_id")
+        distance_mode = data.get("distanceMode") or request.args.get("distanceMode")
+
+        if scenario_id is not None:
+            scenario = scenario_repo.get(int(scenario_id))
+            if scenario is None:
+                return jsonify({"error": "Scenario not found"}), 404
+            depots = scenario.depot_dicts()
+            customers = scenario.customer_dicts()
+            vehicles = scenario.vehicle_dicts()
+            if cost_matrix is None and distance_mode is None:
+                distance_mode = "planar"
+        else:
+            depots = data.get("depots", [])
+            customers = data.get("customers", [])
+            vehicles = data.get("vehicles", [])
+            if cost_matrix is None:
+                cost_matrix = []
+
+        started = time.perf_counter()
+        if distance_mode == "road":
+            # Road distances need the road graph, which only the solver workers keep loaded
+            result = run_solver(precheck_mdvrp_job, depots, customers, vehicles, cost_matrix, distance_mode,
+                                PRECHECK_MAX_ARCS)
+        else:
+            result = precheck_mdvrp_job(depots, customers, vehicles, cost_matrix, distance_mode, PRECHECK_MAX_ARCS)
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
         return jsonify(result), 200
 
     except Exception as e:
         print("SERVER ERROR:", e)
         return jsonify({"error": str(e)}), 500
-    
+
 @app.route("/solvetp", methods=["POST"])
+@profiled
 def solve():
-
+    """
+    Supply/demand come from the payload or, with ?scenario_id=, from the
+    scenario's depot capacities and customer demands, in which case the
+    result is stored. costMatrix is encoded as for /mdvrp.
+    """
     try:
-        data = request.get_json(force=True)
-        costMatrix = data.get("costMatrix")
-        demand = data.get("demand")
-        supply = data.get("supply")
+        started = time.perf_counter()
+        data, costMatrix = read_solver_request(request)
+        scenario_id = request.args.get("scenario_id")
+
+        if scenario_id is not None:
+            scenario = scenario_repo.get(int(scenario_id))
+            if scenario is None:
+                return jsonify({"error": "Scenario not found"}), 404
+            demand = scenario.customer_dicts()
+            supply = scenario.depot_dicts()
+        else:
+            demand = data.get("demand")
+            supply = data.get("supply")
+
+        if not isinstance(demand, list) or not isinstance(supply, list):
+            return jsonify({"error": "Missing demand or supply list"}), 400
+        if costMatrix is None:
+            return jsonify({"error": "Missing costMatrix"}), 400
+        shape_error = matrix_shape_error(costMatrix, len(supply), len(demand), "supply x demand")
+        if shape_error:
+            return jsonify({"error": shape_error}), 400
+
+        d = transform_demand(demand)
+        s = transform_supply(supply)
+
+        solve_started = time.perf_counter()
+        result = run_solver(solve_tp_job, costMatrix, d, s)
+        solve_ms = round((time.perf_counter() - solve_started) * 1000, 1)
+        if scenario_id is not None:
+            result["solution_id"] = store_solution(
+                scenario, "tp", result, "full", (d, s), costMatrix, None, solve_ms, started,
+            )
+        return jsonify(result), 200
 
+    except KeyError as e:
+        return jsonify({"error": f"Missing field {e.args[0]}"}), 400
     except Exception as e:
         print("SERVER ERROR:", e)
         return jsonify({"error": str(e)}), 500
 
-    print(demand)
-    d = transform_demand(demand)
-    s = transform_supply(supply)
 
-    problem = transportationProblem(costMatrix, d, s)
-    problem.solve()
+@app.route("/solutions", methods=["GET"])
+def get_solutions():
+    """
+    Stored solutions of ?scenario_id=, newest first, without routes.
+    Optional ?problem=mdvrp|tp, ?limit= and ?before_id= (id of the last
+    solution of the previous page).
+    """
+    try:
+        scenario_id = int_arg("scenario_id")
+        limit = int_arg("limit")
+        before_id = int_arg("before_id")
+    except ValueError:
+        return jsonify({"error": "Invalid scenario_id, limit or before_id"}), 400
+    if scenario_id is None:
+        return jsonify({"error": "Missing scenario_id"}), 400
+
+    limit = min(max(limit or 50, 1), MAX_PAGE_SIZE)
+    return jsonify(solution_store.history(scenario_id, request.args.get("problem"), limit, before_id)), 200
+
+@app.route("/solutions/latest", methods=["GET"])
+def get_latest_solution():
+    """
+    Newest stored solution of ?scenario_id= (?problem=mdvrp by default) with
+    its routes or shipments, named as in the current scenario.
+    """
+    try:
+        scenario_id = int_arg("scenario_id")
+    except ValueError:
+        return jsonify({"error": "Invalid scenario_id"}), 400
+    if scenario_id is None:
+        return jsonify({"error": "Missing scenario_id"}), 400
+
+    scenario = scenario_repo.get(scenario_id)
+    if scenario is None:
+        return jsonify({"error": "Scenario not found"}), 404
+    solution = solution_store.latest(scenario, request.args.get("problem", "mdvrp"), usable=False)
+    if solution is None:
+        return jsonify({"error": "No stored solution"}), 404
+    return jsonify(solution), 200
+
+@app.route("/solutions/<int:solution_id>", methods=["GET"])
+def get_solution(solution_id):
+    """
+    One stored solution with its routes or shipments; ?scenario_id= is
+    optional and checked when given.
+    """
+    try:
+        scenario_id = int_arg("scenario_id")
+    except ValueError:
+        return jsonify({"error": "Invalid scenario_id"}), 400
+
+    solution = solution_store.get(solution_id, scenario_repo.get)
+    if solution is None or (scenario_id is not None and solution["scenario_id"] != scenario_id):
+        return jsonify({"error": "Solution not found"}), 404
+    return jsonify(solution), 200
+
+
+# ---------------- Admin ---------------- #
+
+# Admin endpoints are closed unless ADMIN_TOKEN is set and sent as X-Admin-Token
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def admin_allowed():
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode())
+
+@app.route("/admin/profiles", methods=["GET"])
+def get_profiles():
+    """
+    Stored request profiles (see profiling.py), newest first.
+    """
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(list_profiles()), 200
+
+@app.route("/admin/profiles/<name>", methods=["GET"])
+def get_profile(name):
+    """
+    Text report of one profile (?sort=cumulative|tottime|calls, ?limit=50),
+    or the raw pstats file with ?format=raw.
+    """
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    if request.args.get("format") == "raw":
+        path = profile_path(name)
+        if path is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return send_file(os.path.abspath(path), mimetype="application/octet-stream",
+                         as_attachment=True, download_name=name + ".prof")
 
-    return jsonify(problem.get_solution_json()), 200
+    try:
+        limit = int_arg("limit") or 50
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    try:
+        report = profile_report(name, request.args.get("sort", "cumulative"), limit)
+    except KeyError as e:
+        return jsonify({"error": f"Invalid sort key {e.args[0]}"}), 400
+    if report is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(report, mimetype="text/plain")
 
 
 if __name__ == "__main__":
+    solver_pool.warm()
     port = int(os.environ.get("PORT", 5000))  
     app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,264 @@
+# batch_solve.py
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+DEFAULT_TIME_LIMIT = 600
+DEFAULT_FLUSH_EVERY = 10
+
+
+def scenario_size(customers, vehicles):
+    """
+    Estimated MILP size: arcs among a vehicle's depot and all customers,
+    for every vehicle.
+    """
+    return vehicles * customers * (customers + 1)
+
+
+def plan_batch(db, done=()):
+    """
+    Scenarios to solve, largest estimated size first, skipping the ids in
+    `done`. Each entry is {"scenario_id", "customers", "vehicles", "size"}.
+    """
+    customer_counts = db.count_by_scenario("customers")
+    vehicle_counts = db.count_by_scenario("vehicles")
+
+    plan = []
+    for row in db.iter_rows("scenarios"):
+        scenario_id = row[0]
+        if scenario_id in done:
+            continue
+        customers = customer_counts.get(scenario_id, 0)
+        vehicles = vehicle_counts.get(scenario_id, 0)
+        plan.append({
+            "scenario_id": scenario_id,
+            "customers": customers,
+            "vehicles": vehicles,
+            "size": scenario_size(customers, vehicles),
+        })
+    # Longest jobs first keeps the pool busy until the end of the run
+    plan.sort(key=lambda job: job["size"], reverse=True)
+    return plan
+
+
+def read_checkpoint(path, db):
+    """
+    Scenario ids already solved in the results file at `path`. Results for
+    scenarios that changed since (other version) or that failed are redone.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # a line cut short by an interrupted run
+                continue
+            if record.get("status") == "Error":
+                continue
+            if record.get("version") == db.get_version(record["scenario_id"]):
+                done.add(record["scenario_id"])
+    return done
+
+
+def batch_job(scenario_id, depots, customers, vehicles, distance_mode, time_limit, initial_routes=None):
+    """
+    Worker side: solve one scenario and time it, warm-started from
+    initial_routes when given. The solver's debug output is discarded so a
+    night of jobs does not flood the log.
+    """
+    from solver_pool import solve_mdvrp_job
+
+    started = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = solve_mdvrp_job(depots, customers, vehicles, None, distance_mode, time_limit,
+                                         initial_routes)
+    except Exception as e:
+        result = {"status": "Error", "error": str(e)}
+    result["scenario_id"] = scenario_id
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+class ResultWriter:
+    """
+    Writes results in batches of `flush_every`: solutions go to the solutions
+    table in one transaction, then the results are appended to the JSON lines
+    checkpoint with one write and fsync. An interruption loses at most one
+    batch, which is solved again on resume.
+    """
+
+    def __init__(self, path, store, flush_every=DEFAULT_FLUSH_EVERY):
+        self.path = path
+        self.store = store
+        self.flush_every = flush_every
+        self.pending = []
+        self.rows = []
+
+    def add(self, record, row=None):
+        self.pending.append(json.dumps(record))
+        if row is not None:
+            self.rows.append(row)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.store.save_many(self.rows)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(self.pending) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending = []
+        self.rows = []
+
+
+def run_batch(db, output, workers=None, time_limit=DEFAULT_TIME_LIMIT, distance_mode="planar",
+              flush_every=DEFAULT_FLUSH_EVERY, report=print):
+    """
+    Solve every stored scenario not yet in `output`, largest first, on a pool
+    of solver processes. Scenarios deleted during the run are skipped and a
+    job that fails (even by crashing its worker) is recorded as Error. Returns
+    a summary with the makespan, the count of each result status and the
+    per-scenario runtimes.
+    """
+    from scenario_repository import scenario_from_rows
+    from solution_store import SolutionStore, input_hash
+    from solver_pool import SolverPool, DEFAULT_WORKERS
+
+    done = read_checkpoint(output, db)
+    plan = plan_batch(db, done)
+    report(f"{len(plan)} scenario(s) to solve, {len(done)} already done in {output}")
+
+    pool = SolverPool(workers or DEFAULT_WORKERS)
+    store = SolutionStore(db)
+    writer = ResultWriter(output, store, flush_every)
+    runtimes = {}
+    statuses = {}
+    skipped = []
+    started = time.perf_counter()
+
+    def submit(job):
+        """
+        Load the scenario and queue its job; None when it was deleted since
+        the plan was made.
+        """
+        scenario = scenario_from_rows(db.get_scenario_rows(job["scenario_id"]))
+        if scenario is None:
+            return None
+        job["scenario"] = scenario
+        job["version"] = db.get_version(job["scenario_id"])
+        inputs = (scenario.depot_dicts(), scenario.customer_dicts(), scenario.vehicle_dicts())
+        job["input_hash"] = input_hash("mdvrp", *inputs, distance_mode, None)
+        # The scenario's latest stored plan is the warm start
+        previous = store.latest(scenario)
+        initial_routes = previous["routes"] if previous is not None else None
+        job["submitted"] = time.perf_counter()
+        return pool.submit(batch_job, job["scenario_id"], *inputs, distance_mode, time_limit, initial_routes)
+
+    def submit_next(queue, running):
+        for job in queue:
+            future = submit(job)
+            if future is not None:
+                running[future] = job
+                return True
+            skipped.append(job["scenario_id"])
+            report(f"  scenario {job['scenario_id']}: deleted since the plan was made, skipped")
+        return False
+
+    try:
+        # Keep at most two jobs per worker queued; scenarios are loaded just in time
+        queue = iter(plan)
+        running = {}
+        while len(running) < 2 * pool.workers and submit_next(queue, running):
+            pass
+
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # e.g. BrokenProcessPool when a worker died; the pool is
+                    # replaced on the next submit and the run goes on
+                    result = {
+                        "status": "Error",
+                        "error": f"{type(e).__name__}: {e}",
+                        "scenario_id": job["scenario_id"],
+                        "seconds": round(time.perf_counter() - job["submitted"], 3),
+                    }
+                result["version"] = job["version"]
+                result["size"] = job["size"]
+                result["solved_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+                row = None
+                if result["status"] != "Error":
+                    try:
+                        row = store.record(
+                            job["scenario"], "mdvrp", result, "batch", distance_mode=distance_mode,
+                            timings={"solve_ms": result["seconds"] * 1000, "total_ms": result["seconds"] * 1000},
+                            input_hash=job["input_hash"], scenario_version=job["version"],
+                        )
+                    except ValueError as e:
+                        result["status"], result["error"] = "Error", str(e)
+                writer.add(result, row)
+                runtimes[job["scenario_id"]] = result["seconds"]
+                statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+                report(f"  scenario {job['scenario_id']}: {result['status']} in {result['seconds']}s "
+                       f"({job['customers']} customers, {job['vehicles']} vehicles)")
+
+                submit_next(queue, running)
+    finally:
+        writer.flush()
+        pool.shutdown()
+
+    makespan = time.perf_counter() - started
+    total = sum(runtimes.values())
+    summary = {
+        "scenarios": len(runtimes),
+        "statuses": statuses,
+        "skipped": skipped,
+        "makespan_seconds": round(makespan, 3),
+        "total_solve_seconds": round(total, 3),
+        "parallel_speedup": round(total / makespan, 2) if makespan > 0 else None,
+        "runtimes": runtimes,
+    }
+    # "Feasible" marks solves cut short by the time limit, not proven optimal
+    counts = ", ".join(f"{n} {status}" for status, n in sorted(statuses.items()))
+    report(f"Solved {len(runtimes)} scenario(s) in {makespan:.1f}s "
+           f"({total:.1f}s of solver time on {pool.workers} worker(s)): {counts or 'none'}")
+    return summary
+
+
+# ---------------- Command line ---------------- #
+if __name__ == "__main__":
+    from data_handler import DataHandler
+
+    parser = argparse.ArgumentParser(description="Solve the MDVRP of every stored scenario.")
+    parser.add_argument("--output", help="results JSON lines file; an existing file is resumed "
+                                         "(default ../data/batch-<date>.jsonl)")
+    parser.add_argument("--workers", type=int, help="solver processes (default SOLVER_WORKERS)")
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT,
+                        help="CBC time budget per scenario in seconds")
+    parser.add_argument("--distance-mode", default="planar", help="planar, haversine or road")
+    parser.add_argument("--flush-every", type=int, default=DEFAULT_FLUSH_EVERY,
+                        help="results buffered per write to the output file")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(__file__), "../data/data.db"))
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), f"../data/batch-{datetime.date.today().isoformat()}.jsonl"
+    )
+    db = DataHandler(args.db)
+    try:
+        run_batch(db, output, args.workers, args.time_limit, args.distance_mode, args.flush_every)
+    finally:
+        db.close()
@@ -0,0 +1,212 @@
+# csv_import.py
+import argparse
+import csv
+import datetime
+import itertools
+import os
+import time
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Required CSV columns per table, as found in data/*.csv
+REQUIRED_COLUMNS = {
+    "depots": ["DepotID", "DepotName", "Latitude", "Longitude"],
+    "customers": ["CustomerID", "X", "Y", "Demand"],
+    "vehicles": ["VehicleID", "Capacity"],
+}
+
+
+def parse_number(value):
+    """
+    Parse a CSV cell into an int when it is integral, a float otherwise,
+    and None when it is empty.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def read_csv_chunks(stream, table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a CSV file and yield lists of at most `chunk_size` row dicts.
+    Only one chunk is held in memory at a time.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    reader = csv.DictReader(stream)
+    columns = [c.strip() for c in reader.fieldnames or []]
+    reader.fieldnames = columns
+
+    missing = [c for c in REQUIRED_COLUMNS[table] if c not in columns]
+    if missing:
+        raise ValueError(f"{table} CSV is missing columns: {', '.join(missing)}")
+
+    while True:
+        chunk = list(itertools.islice(reader, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def depot_values(row, scenario_id):
+    # depot_x / depot_y hold latitude / longitude, like the rows the UI creates
+    return [
+        None,
+        scenario_id,
+        row["DepotName"].strip(),
+        parse_number(row["Latitude"]),
+        parse_number(row["Longitude"]),
+        parse_number(row.get("Capacity")),
+        parse_number(row.get("MaxDistance")),
+        (row.get("Type") or "").strip(),
+    ]
+
+
+def customer_values(row, scenario_id):
+    name = (row.get("CustomerName") or "").strip() or f"Customer {row['CustomerID'].strip()}"
+    return [
+        None,
+        scenario_id,
+        name,
+        parse_number(row["X"]),
+        parse_number(row["Y"]),
+        parse_number(row["Demand"]) or 0,
+    ]
+
+
+class ImportProgress:
+    """
+    Counts imported rows per table and reports throughput after every chunk.
+    """
+
+    def __init__(self, report=print):
+        self.report = report
+        self.tables = {}
+
+    def start(self, table):
+        self.tables[table] = {"rows": 0, "started": time.perf_counter(), "seconds": 0.0}
+
+    def add(self, table, rows):
+        stats = self.tables[table]
+        stats["rows"] += rows
+        stats["seconds"] = time.perf_counter() - stats["started"]
+        if self.report:
+            rate = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+            self.report(f"[{table}] {stats['rows']:,} rows ({rate:,.0f} rows/s)")
+
+    def summary(self):
+        result = {}
+        for table, stats in self.tables.items():
+            seconds = stats["seconds"]
+            result[table] = {
+                "rows": stats["rows"],
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(stats["rows"] / seconds, 1) if seconds > 0 else None,
+            }
+        return result
+
+
+def import_scenario(db, name, depots=None, customers=None, vehicles=None,
+                    date=None, chunk_size=DEFAULT_CHUNK_SIZE, report=print):
+    """
+    Create a scenario and bulk-insert its depots, customers and vehicles from
+    CSV text streams, one transaction per chunk.
+
+    Vehicles are bound to depots through an optional DepotID column that
+    refers to the depots CSV; without it they are spread round-robin over
+    the imported depots. On any error the partially imported scenario is
+    removed again.
+    """
+    if vehicles is not None and depots is None:
+        raise ValueError("Importing vehicles requires a depots CSV")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+
+    date = date or datetime.datetime.now().strftime("%Y-%m-%d")
+    scenario_id = db.insert("scenarios", [None, name, date])
+    progress = ImportProgress(report)
+
+    try:
+        depot_ids = {}
+        if depots is not None:
+            progress.start("depots")
+            for chunk in read_csv_chunks(depots, "depots", chunk_size):
+                ids = db.insert_many("depots", [depot_values(r, scenario_id) for r in chunk], return_ids=True)
+                for row, depot_id in zip(chunk, ids):
+                    depot_ids[row["DepotID"].strip()] = depot_id
+                progress.add("depots", len(chunk))
+
+        if customers is not None:
+            progress.start("customers")
+            for chunk in read_csv_chunks(customers, "customers", chunk_size):
+                db.insert_many("customers", [customer_values(r, scenario_id) for r in chunk])
+                progress.add("customers", len(chunk))
+
+        if vehicles is not None:
+            if not depot_ids:
+                raise ValueError("Depots CSV contains no rows to assign vehicles to")
+            round_robin = itertools.cycle(list(depot_ids.values()))
+            progress.start("vehicles")
+            for chunk in read_csv_chunks(vehicles, "vehicles", chunk_size):
+                rows = []
+                for r in chunk:
+                    csv_depot = (r.get("DepotID") or "").strip()
+                    if csv_depot:
+                        if csv_depot not in depot_ids:
+                            raise ValueError(f"Vehicle {r['VehicleID']} refers to unknown DepotID {csv_depot}")
+                        depot_id = depot_ids[csv_depot]
+                    else:
+                        depot_id = next(round_robin)
+                    rows.append([None, scenario_id, parse_number(r["Capacity"]), depot_id])
+                db.insert_many("vehicles", rows)
+                progress.add("vehicles", len(chunk))
+
+    except Exception:
+        for table in ("depots", "vehicles", "customers"):
+            db.delete_by_id(table, scenario_id, column="scenario_id")
+        db.delete_by_id("scenarios", scenario_id)
+        raise
+
+    return {
+        "id": scenario_id,
+        "name": name,
+        "date": date,
+        "tables": progress.summary(),
+    }
+
+
+# ---------------- Command line ---------------- #
+if __name__ == "__main__":
+    from data_handler import DataHandler
+
+    parser = argparse.ArgumentParser(description="Import a scenario from depot, customer and vehicle CSV files.")
+    parser.add_argument("--name", required=True, help="scenario name")
+    parser.add_argument("--depots", help="depots CSV (DepotID,DepotName,Latitude,Longitude,...)")
+    parser.add_argument("--customers", help="customers CSV (CustomerID,X,Y,Demand)")
+    parser.add_argument("--vehicles", help="vehicles CSV (VehicleID,Capacity[,DepotID])")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(__file__), "../data/data.db"))
+    args = parser.parse_args()
+
+    def open_csv(path):
+        return open(path, newline="", encoding="utf-8-sig") if path else None
+
+    db = DataHandler(args.db)
+    files = [open_csv(args.depots), open_csv(args.customers), open_csv(args.vehicles)]
+    try:
+        result = import_scenario(db, args.name, *files, chunk_size=args.chunk_size)
+    finally:
+        for f in files:
+            if f is not None:
+                f.close()
+        db.close()
+
+    print(f"Scenario {result['id']} imported:")
+    for table, stats in result["tables"].items():
+        print(f"  {table}: {stats['rows']:,} rows in {stats['seconds']}s ({stats['rows_per_second']} rows/s)")
@@ -1,10 +1,166 @@
 # data_handler.py
 import sqlite3
 
+# Tables whose rows belong to a scenario through a scenario_id column
+SCENARIO_TABLES = ("depots", "customers", "vehicles")
+
+# scenario_versions key for the scenario list itself (ids start at 1)
+SCENARIO_LIST_KEY = 0
+
 class DataHandler:
     def __init__(self, db_path):
         # Allow Flask multithreading
         self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        cur = self.connection.cursor()
+        # (scenario_id, id) serves both scenario filters and keyset pagination
+        for table in SCENARIO_TABLES:
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_scenario "
+                f"ON {table} (scenario_id, id)"
+            )
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS scenario_versions ("
+            "scenario_id INTEGER PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        # Stored solver results, routes packed by solution_store
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "scenario_id INTEGER NOT NULL REFERENCES scenarios(id), "
+            "created_at TEXT NOT NULL, "
+            "problem TEXT NOT NULL, "
+            "status TEXT, "
+            "solver_mode TEXT, "
+            "distance_mode TEXT, "
+            "total_cost REAL, "
+            "solve_ms REAL, "
+            "total_ms REAL, "
+            "input_hash TEXT, "
+            "scenario_version INTEGER, "
+            "routes BLOB, "
+            "demands BLOB)"
+        )
+        # Cost matrices of scenario-mode solves, once per solver input hash
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS cost_matrices ("
+            "input_hash TEXT PRIMARY KEY, "
+            "rows INTEGER NOT NULL, "
+            "cols INTEGER NOT NULL, "
+            "data BLOB NOT NULL)"
+        )
+        # Latest and history reads: newest id of a scenario (and problem) first
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_solutions_scenario "
+            "ON solutions (scenario_id, problem, id)"
+        )
+        self.connection.commit()
+        cur.close()
+
+    # -------------------
+    # Scenario versions
+    # -------------------
+    def get_version(self, scenario_id):
+        """
+        Return the change counter of a scenario (SCENARIO_LIST_KEY for the
+        scenario list). Scenarios that were never modified are at version 0.
+        """
+        cur = self.connection.cursor()
+        cur.execute("SELECT version FROM scenario_versions WHERE scenario_id=?", (scenario_id,))
+        result = cur.fetchone()
+        cur.close()
+        return result[0] if result else 0
+
+    def _bump_versions(self, cur, scenario_ids):
+        # Runs inside the caller's transaction, before its commit
+        for scenario_id in set(scenario_ids):
+            if scenario_id is None:
+                continue
+            cur.execute(
+                "INSERT INTO scenario_versions (scenario_id, version) VALUES (?, 1) "
+                "ON CONFLICT(scenario_id) DO UPDATE SET version = version + 1",
+                (scenario_id,),
+            )
+
+    def _affected_scenarios(self, cur, table, row_id, column="id"):
+        """
+        Scenario ids touched by changing the rows of `table` where column=row_id.
+        Must be called before the change so deleted rows can still be looked up.
+        """
+        if table == "scenarios":
+            return [row_id, SCENARIO_LIST_KEY]
+        if table not in SCENARIO_TABLES:
+            return []
+        if column == "scenario_id":
+            return [row_id]
+        cur.execute(f"SELECT DISTINCT scenario_id FROM {table} WHERE {column}=?", (row_id,))
+        return [row[0] for row in cur.fetchall()]
+
+    # -------------------
+    # Solutions
+    # -------------------
+    def get_solutions(self, scenario_id, problem=None, limit=50, before_id=None, statuses=None, columns="*"):
+        """
+        Newest-first page of a scenario's stored solutions, optionally only
+        those with one of `statuses`. Pass the id of the last row as the next
+        before_id.
+        """
+        clauses, params = ["scenario_id=?"], [scenario_id]
+        if problem is not None:
+            clauses.append("problem=?")
+            params.append(problem)
+        if statuses:
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params += list(statuses)
+        if before_id is not None:
+            clauses.append("id<?")
+            params.append(before_id)
+
+        cur = self.connection.cursor()
+        cur.execute(
+            f"SELECT {columns} FROM solutions WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        )
+        results = cur.fetchall()
+        cur.close()
+        return results
+
+    def save_cost_matrix(self, input_hash, rows, cols, data):
+        """
+        Store a packed cost matrix under its solve's input hash; a matrix
+        already stored under that hash is kept.
+        """
+        cur = self.connection.cursor()
+        cur.execute(
+            "INSERT OR IGNORE INTO cost_matrices (input_hash, rows, cols, data) VALUES (?, ?, ?, ?)",
+            (input_hash, rows, cols, data),
+        )
+        self.connection.commit()
+        cur.close()
+
+    def get_cost_matrix(self, input_hash):
+        """
+        (rows, cols, data) of the cost matrix stored under input_hash, or None.
+        """
+        cur = self.connection.cursor()
+        cur.execute("SELECT rows, cols, data FROM cost_matrices WHERE input_hash=?", (input_hash,))
+        result = cur.fetchone()
+        cur.close()
+        return result
+
+    def delete_unused_cost_matrices(self):
+        """
+        Remove cost matrices no stored solution refers to any more.
+        """
+        cur = self.connection.cursor()
+        cur.execute(
+            "DELETE FROM cost_matrices WHERE input_hash NOT IN "
+            "(SELECT input_hash FROM solutions WHERE input_hash IS NOT NULL)"
+        )
+        self.connection.commit()
+        cur.close()
 
     # -------------------
     # General methods
@@ -23,27 +179,149 @@ class DataHandler:
         cur.close()
         return results
 
+    def get_page(self, table, limit, after_id=None, scenario_id=None):
+        """
+        Keyset pagination: return at most `limit` rows with id > after_id,
+        ordered by id. Pass the id of the last row as the next after_id.
+        """
+        clauses, params = [], []
+        if scenario_id is not None:
+            clauses.append("scenario_id=?")
+            params.append(scenario_id)
+        if after_id is not None:
+            clauses.append("id>?")
+            params.append(after_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        cur = self.connection.cursor()
+        cur.execute(f"SELECT * FROM {table}{where} ORDER BY id LIMIT ?", (*params, limit))
+        results = cur.fetchall()
+        cur.close()
+        return results
+
+    def count_by_scenario(self, table):
+        """
+        Row count per scenario_id for a scenario table, in one indexed query.
+        """
+        cur = self.connection.cursor()
+        cur.execute(f"SELECT scenario_id, COUNT(*) FROM {table} GROUP BY scenario_id")
+        results = dict(cur.fetchall())
+        cur.close()
+        return results
+
+    def iter_rows(self, table, scenario_id=None, batch_size=1000, after_id=None):
+        """
+        Yield rows one by one from a cursor, fetching `batch_size` at a time,
+        so memory stays constant regardless of table size. Rows start after
+        after_id, so an interrupted stream can be resumed from its last id.
+        """
+        clauses, params = [], []
+        if scenario_id is not None:
+            clauses.append("scenario_id=?")
+            params.append(scenario_id)
+        if after_id is not None:
+            clauses.append("id>?")
+            params.append(after_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        cur = self.connection.cursor()
+        try:
+            cur.execute(f"SELECT * FROM {table}{where} ORDER BY id", params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
+    def get_scenario_rows(self, scenario_id):
+        """
+        Load a scenario and all of its depots, customers and vehicles in one
+        query. Every row is (kind, id, c1..c6), padded with NULLs, where kind
+        is one of 'scenario', 'depot', 'customer', 'vehicle' and the remaining
+        columns follow the table's own column order after scenario_id.
+        """
+        cur = self.connection.cursor()
+        cur.execute(
+            """
+            SELECT 'scenario', id, name, date, NULL, NULL, NULL, NULL
+              FROM scenarios WHERE id=?
+            UNION ALL
+            SELECT 'depot', id, depot_name, depot_x, depot_y, capacity, max_distance, type
+              FROM depots WHERE scenario_id=?
+            UNION ALL
+            SELECT 'customer', id, customer_name, customer_x, customer_y, demand, NULL, NULL
+              FROM customers WHERE scenario_id=?
+            UNION ALL
+            SELECT 'vehicle', id, capacity, max_distance, NULL, NULL, NULL, NULL
+              FROM vehicles WHERE scenario_id=?
+            """,
+            (scenario_id,) * 4,
+        )
+        results = cur.fetchall()
+        cur.close()
+        return results
+
     def insert(self, table, values):
         cur = self.connection.cursor()
         placeholders = ",".join(["?"] * len(values))
         cur.execute(f"INSERT INTO {table} VALUES ({placeholders})", values)
-        self.connection.commit()
-        
+
         inserted_id = values[0] if values[0] is not None else cur.lastrowid
-        
+
+        if table == "scenarios":
+            self._bump_versions(cur, [inserted_id, SCENARIO_LIST_KEY])
+        elif table in SCENARIO_TABLES:
+            self._bump_versions(cur, [values[1]])
+        self.connection.commit()
+
         cur.close()
         return inserted_id
 
 
+    def insert_many(self, table, rows, return_ids=False):
+        """
+        Insert many rows in a single transaction. Returns the row count, or the
+        list of ids when return_ids is set (slower: rows are inserted one by one).
+        """
+        if not rows:
+            return [] if return_ids else 0
+
+        cur = self.connection.cursor()
+        placeholders = ",".join(["?"] * len(rows[0]))
+        sql = f"INSERT INTO {table} VALUES ({placeholders})"
+        if return_ids:
+            result = []
+            for values in rows:
+                cur.execute(sql, values)
+                result.append(values[0] if values[0] is not None else cur.lastrowid)
+        else:
+            cur.executemany(sql, rows)
+            result = len(rows)
+
+        if table in SCENARIO_TABLES:
+            self._bump_versions(cur, [values[1] for values in rows])
+        self.connection.commit()
+        cur.close()
+        return result
+
     def delete_by_id(self, table, row_id, column="id"):
         cur = self.connection.cursor()
+        affected = self._affected_scenarios(cur, table, row_id, column)
         cur.execute(f"DELETE FROM {table} WHERE {column}=?", (row_id,))
+        self._bump_versions(cur, affected)
         self.connection.commit()
         cur.close()
 
     def update_by_id(self, table, row_id, column, value):
         cur = self.connection.cursor()
+        affected = self._affected_scenarios(cur, table, row_id)
+        if column == "scenario_id":
+            # Moving a row changes its new scenario as well
+            affected.append(value)
         cur.execute(f"UPDATE {table} SET {column}=? WHERE id=?", (value, row_id))
+        self._bump_versions(cur, affected)
         self.connection.commit()
         cur.close()
 
@@ -59,6 +337,12 @@ class DataHandler:
     # -------------------
     def clear_table(self, table):
         cur = self.connection.cursor()
+        if table == "scenarios":
+            cur.execute("SELECT id FROM scenarios")
+            self._bump_versions(cur, [row[0] for row in cur.fetchall()] + [SCENARIO_LIST_KEY])
+        elif table in SCENARIO_TABLES:
+            cur.execute(f"SELECT DISTINCT scenario_id FROM {table}")
+            self._bump_versions(cur, [row[0] for row in cur.fetchall()])
         cur.execute(f"DELETE FROM {table}")
         self.connection.commit()
         cur.close()
@@ -0,0 +1,435 @@
+# distance_engine.py
+"""
+Node-to-node distance matrices for depots + customers.
+
+Modes:
+- planar:    degrees treated as planar, one degree ~ 111 km (the historic default)
+- haversine: great-circle distance in metres, vectorized over all pairs
+- road:      shortest paths on a local road graph, answered with a
+             contraction hierarchy (CH) index built offline with
+             `python distance_engine.py <graph.npz>`
+
+Coordinates follow the database convention: *_x is latitude, *_y longitude.
+All modes return an (N, N) float array over nodes = depots + customers.
+"""
+import argparse
+import heapq
+import os
+import threading
+import time
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+METRES_PER_DEGREE = 111000
+METRES_PER_LATITUDE_DEGREE = EARTH_RADIUS_M * np.pi / 180
+DISTANCE_MODES = ("planar", "haversine", "road")
+
+# Settled-node limit of the witness searches run while contracting
+WITNESS_SEARCH_LIMIT = 500
+CH_INDEX_VERSION = 1
+
+
+def node_coordinates(depots, customers):
+    """
+    Return (lat, lon) arrays over depots followed by customers.
+    """
+    lat = [d["depot_x"] for d in depots] + [c["customer_x"] for c in customers]
+    lon = [d["depot_y"] for d in depots] + [c["customer_y"] for c in customers]
+    return np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+
+
+def planar_matrix(lat, lon):
+    return np.hypot(lat[:, None] - lat[None, :], lon[:, None] - lon[None, :]) * METRES_PER_DEGREE
+
+
+def haversine_matrix(lat1, lon1, lat2=None, lon2=None):
+    """
+    Great-circle distances in metres between every (lat1, lon1) and every
+    (lat2, lon2) point; the second set defaults to the first.
+    """
+    if lat2 is None:
+        lat2, lon2 = lat1, lon1
+    phi1, phi2 = np.radians(lat1)[:, None], np.radians(lat2)[None, :]
+    dphi = phi2 - phi1
+    dlmb = np.radians(lon2)[None, :] - np.radians(lon1)[:, None]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ---------------- Road network ---------------- #
+
+def _to_csr(n, edges):
+    """
+    edges: dict node -> list of (neighbour, weight). Returns CSR arrays.
+    """
+    counts = np.zeros(n + 1, dtype=np.int64)
+    for u, targets in edges.items():
+        counts[u + 1] = len(targets)
+    indptr = np.cumsum(counts)
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    weights = np.empty(indptr[-1], dtype=np.float64)
+    for u, targets in edges.items():
+        start = indptr[u]
+        for k, (v, w) in enumerate(targets):
+            indices[start + k] = v
+            weights[start + k] = w
+    return indptr, indices, weights
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a directed graph. Only the upward graphs are
+    kept: `fwd` holds edges u -> v with rank[u] < rank[v], `bwd` holds
+    reversed edges v -> u of arcs u -> v with rank[u] > rank[v]. Every
+    shortest path is an upward forward search meeting an upward backward
+    search, which is what many_to_many exploits.
+    """
+
+    def __init__(self, rank, fwd, bwd):
+        self.rank = rank
+        self.fwd = fwd
+        self.bwd = bwd
+        # The searches index the graphs edge by edge, which is far faster on
+        # Python lists than on arrays; convert once, not per matrix request
+        self._search_fwd = tuple(a.tolist() for a in fwd)
+        self._search_bwd = tuple(a.tolist() for a in bwd)
+
+    @classmethod
+    def build(cls, n, edge_from, edge_to, edge_weight, report=print):
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u, v, w in zip(edge_from.tolist(), edge_to.tolist(), edge_weight.tolist()):
+            if u != v and w < out_edges[u].get(v, float("inf")):
+                out_edges[u][v] = w
+                in_edges[v][u] = w
+
+        # Plain lists: scalar access is much faster than on numpy arrays
+        contracted = [False] * n
+        deleted_neighbours = [0] * n
+        inf = float("inf")
+
+        def witness_distances(source, excluded, targets, limit):
+            # Bounded Dijkstra from source over uncontracted nodes, avoiding
+            # `excluded`; stops once every target is settled
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            remaining = set(targets)
+            settled = 0
+            while heap and remaining and settled < WITNESS_SEARCH_LIMIT:
+                d, u = heapq.heappop(heap)
+                if d > limit:
+                    break
+                if d > dist[u]:
+                    continue
+                settled += 1
+                remaining.discard(u)
+                for v, w in out_edges[u].items():
+                    if v == excluded or contracted[v]:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+            return dist
+
+        def shortcuts_for(v):
+            shortcuts = []
+            ins = [(u, w) for u, w in in_edges[v].items() if not contracted[u]]
+            outs = [(x, w) for x, w in out_edges[v].items() if not contracted[x]]
+            if not ins or not outs:
+                return shortcuts
+            max_out = max(w for _, w in outs)
+            targets = [x for x, _ in outs]
+            for u, w_in in ins:
+                dist = witness_distances(u, v, targets, w_in + max_out)
+                for x, w_out in outs:
+                    if x != u and dist.get(x, inf) > w_in + w_out:
+                        shortcuts.append((u, x, w_in + w_out))
+            return shortcuts
+
+        def priority(v):
+            degree = sum(1 for u in in_edges[v] if not contracted[u]) + \
+                     sum(1 for x in out_edges[v] if not contracted[x])
+            return len(shortcuts_for(v)) - degree + deleted_neighbours[v]
+
+        started = time.perf_counter()
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = np.empty(n, dtype=np.int64)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if contracted[v]:
+                continue
+            # Lazy update: re-queue when the stored priority is outdated
+            current = priority(v)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, x, w in shortcuts_for(v):
+                if w < out_edges[u].get(x, inf):
+                    out_edges[u][x] = w
+                    in_edges[x][u] = w
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+            for nb in list(in_edges[v]) + list(out_edges[v]):
+                deleted_neighbours[nb] += 1
+            if report and order % 10000 == 0:
+                report(f"CH: contracted {order:,}/{n:,} nodes ({time.perf_counter() - started:.0f}s)")
+
+        fwd, bwd = {}, {}
+        for u in range(n):
+            for v, w in out_edges[u].items():
+                if rank[u] < rank[v]:
+                    fwd.setdefault(u, []).append((v, w))
+                else:
+                    bwd.setdefault(v, []).append((u, w))
+        return cls(rank, _to_csr(n, fwd), _to_csr(n, bwd))
+
+    def save(self, path):
+        """
+        Write to a temporary file and move it into place, so readers never
+        see a partially written index.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=CH_INDEX_VERSION,
+            rank=self.rank,
+            fwd_indptr=self.fwd[0], fwd_indices=self.fwd[1], fwd_weights=self.fwd[2],
+            bwd_indptr=self.bwd[0], bwd_indices=self.bwd[1], bwd_weights=self.bwd[2],
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            if int(f["version"]) != CH_INDEX_VERSION:
+                raise ValueError(f"CH index {path} has an outdated format")
+            return cls(
+                f["rank"],
+                (f["fwd_indptr"], f["fwd_indices"], f["fwd_weights"]),
+                (f["bwd_indptr"], f["bwd_indices"], f["bwd_weights"]),
+            )
+
+    @staticmethod
+    def _upward_search(graph, source):
+        """
+        Dijkstra over an upward graph; returns (settled nodes, distances) arrays.
+        """
+        indptr, indices, weights = graph
+        inf = float("inf")
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        nodes, dists = [], []
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            nodes.append(u)
+            dists.append(d)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return np.array(nodes, dtype=np.int64), np.array(dists)
+
+    def many_to_many(self, sources, targets, block_bytes=64 * 2**20):
+        """
+        Shortest path lengths between every source and target graph node.
+        One upward search per source and per target; the searches meet in a
+        dense (meeting node x target) table so the join is a vectorized
+        min-plus product, done in column blocks of at most block_bytes.
+        Unreachable pairs are inf.
+        """
+        if len(sources) == 0 or len(targets) == 0:
+            return np.full((len(sources), len(targets)), np.inf)
+
+        backward = [self._upward_search(self._search_bwd, int(t)) for t in targets]
+        meeting = np.unique(np.concatenate([nodes for nodes, _ in backward]))
+
+        forward = []
+        for s in sources:
+            nodes, dists = self._upward_search(self._search_fwd, int(s))
+            pos = np.searchsorted(meeting, nodes)
+            pos = np.minimum(pos, len(meeting) - 1)
+            keep = meeting[pos] == nodes
+            forward.append((pos[keep], dists[keep]))
+
+        result = np.full((len(sources), len(targets)), np.inf)
+        block = max(1, block_bytes // (8 * max(len(meeting), 1)))
+        for t0 in range(0, len(targets), block):
+            t1 = min(t0 + block, len(targets))
+            table = np.full((len(meeting), t1 - t0), np.inf)
+            for k in range(t0, t1):
+                nodes, dists = backward[k]
+                table[np.searchsorted(meeting, nodes), k - t0] = dists
+            for i, (rows, dists) in enumerate(forward):
+                if len(rows):
+                    result[i, t0:t1] = (table[rows] + dists[:, None]).min(axis=0)
+        return result
+
+
+class RoadNetwork:
+    """
+    A road graph loaded from an .npz file with arrays
+        node_lat, node_lon               (float, one entry per node)
+        edge_from, edge_to, edge_weight  (directed edges, weight in metres or seconds)
+    Two-way roads are given as two edges. The CH index lives next to the
+    graph as <graph>.ch.npz. Building it can take hours on real graphs, so it
+    is never built while serving: a missing or stale index is an error and
+    build_index() (the command line of this module) creates it offline.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as f:
+            self.node_lat = f["node_lat"].astype(np.float64)
+            self.node_lon = f["node_lon"].astype(np.float64)
+
+        index_path = index_path_for(path)
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+            raise ValueError(
+                f"No up-to-date CH index for road graph {path}: "
+                f"build it with `python distance_engine.py {path}`"
+            )
+        self.ch = ContractionHierarchy.load(index_path)
+
+        # Nodes sorted by latitude, for snapping by latitude band
+        self._lat_order = np.argsort(self.node_lat)
+        self._sorted_lat = self.node_lat[self._lat_order]
+
+    def snap(self, lat, lon, band=0.05):
+        """
+        Nearest graph node (by great-circle distance) of every point, and the
+        distance to it. Only nodes within a latitude band are compared. The
+        band widens until it holds a node, then once more to the latitude
+        span of the best distance found, since a closer node can only lie
+        within that span.
+        """
+        nodes = np.empty(len(lat), dtype=np.int64)
+        offsets = np.empty(len(lat))
+        n = len(self._sorted_lat)
+        for k, (la, lo) in enumerate(zip(lat, lon)):
+            width = band
+            while True:
+                lo_i = np.searchsorted(self._sorted_lat, la - width, "left")
+                hi_i = np.searchsorted(self._sorted_lat, la + width, "right")
+                if hi_i > lo_i or (lo_i == 0 and hi_i == n):
+                    candidates = self._lat_order[lo_i:hi_i]
+                    d = haversine_matrix(
+                        np.array([la]), np.array([lo]), self.node_lat[candidates], self.node_lon[candidates]
+                    )[0]
+                    best = int(np.argmin(d))
+                    # Great-circle distance is at least the latitude difference
+                    needed = d[best] / METRES_PER_LATITUDE_DEGREE
+                    if width >= needed or (lo_i == 0 and hi_i == n):
+                        break
+                    width = needed * (1 + 1e-9)
+                else:
+                    width *= 4
+            nodes[k] = candidates[best]
+            offsets[k] = d[best]
+        return nodes, offsets
+
+    def matrix(self, lat, lon):
+        """
+        Road distance between every pair of points, including the straight-line
+        legs from each point to its snapped graph node.
+        """
+        nodes, offsets = self.snap(lat, lon)
+        unique, inverse = np.unique(nodes, return_inverse=True)
+        road = self.ch.many_to_many(unique, unique)[inverse][:, inverse]
+        result = road + offsets[:, None] + offsets[None, :]
+        np.fill_diagonal(result, 0.0)
+        return result
+
+
+def index_path_for(graph_path):
+    root, _ = os.path.splitext(graph_path)
+    return root + ".ch.npz"
+
+
+def build_index(graph_path, report=print):
+    """
+    Build the CH index of a road graph and write it to index_path_for(graph_path).
+    """
+    with np.load(graph_path) as f:
+        n_nodes = len(f["node_lat"])
+        edge_from, edge_to, edge_weight = f["edge_from"], f["edge_to"], f["edge_weight"]
+
+    started = time.perf_counter()
+    ch = ContractionHierarchy.build(n_nodes, edge_from, edge_to, edge_weight.astype(np.float64), report)
+    index_path = index_path_for(graph_path)
+    ch.save(index_path)
+    if report:
+        report(f"CH index built in {time.perf_counter() - started:.1f}s: {index_path}")
+    return index_path
+
+
+_road_networks = {}
+_road_lock = threading.Lock()
+
+
+def get_road_network(path=None):
+    """
+    Process-wide cached RoadNetwork for `path` (default: ROAD_GRAPH_PATH).
+    """
+    path = path or os.environ.get("ROAD_GRAPH_PATH")
+    if not path:
+        raise ValueError("Road distances need a road graph: set ROAD_GRAPH_PATH")
+    with _road_lock:
+        if path not in _road_networks:
+            _road_networks[path] = RoadNetwork(path)
+        return _road_networks[path]
+
+
+def build_node_matrix(depots, customers, mode="planar"):
+    """
+    Distance matrix over depots + customers (row/column order) for one of
+    DISTANCE_MODES.
+    """
+    lat, lon = node_coordinates(depots, customers)
+    if mode == "planar":
+        return planar_matrix(lat, lon)
+    if mode == "haversine":
+        return haversine_matrix(lat, lon)
+    if mode == "road":
+        return get_road_network().matrix(lat, lon)
+    raise ValueError(f"Unknown distance mode {mode!r}, expected one of {', '.join(DISTANCE_MODES)}")
+
+
+def node_matrix_from_cost(depots, customers, cost_matrix, inf_replace=1e12):
+    """
+    Array equivalent of utilities.build_distance_matrix: depot <-> customer
+    from a depot x customer cost matrix (missing entries inf_replace),
+    customer pairs planar, depot -> depot forbidden.
+    """
+    n_depots = len(depots)
+    lat, lon = node_coordinates(depots, customers)
+    matrix = planar_matrix(lat, lon)
+
+    cost = np.array(cost_matrix, dtype=np.float64)
+    if cost.shape != (n_depots, len(customers)):
+        raise ValueError(
+            f"cost_matrix is {'x'.join(map(str, cost.shape))}, expected {n_depots}x{len(customers)} (depots x customers)"
+        )
+    cost[np.isnan(cost)] = inf_replace
+    matrix[:n_depots, n_depots:] = cost
+    matrix[n_depots:, :n_depots] = cost.T
+    matrix[:n_depots, :n_depots] = inf_replace
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+# ---------------- Command line ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the contraction hierarchy index of a road graph.")
+    parser.add_argument("graph", help="road graph .npz (node_lat, node_lon, edge_from, edge_to, edge_weight)")
+    args = parser.parse_args()
+
+    build_index(args.graph)
@@ -0,0 +1,121 @@
+# matrix_io.py
+import ast
+import json
+
+# Accepted element types for binary cost matrices, always little-endian
+BINARY_DTYPES = {"float32": "<f4", "float64": "<f8"}
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def parse_shape(text):
+    """
+    Parse a 'rows,cols' (or 'rowsxcols') shape header into a tuple of ints.
+    """
+    parts = text.replace("x", ",").split(",")
+    shape = tuple(int(p) for p in parts if p.strip())
+    if len(shape) != 2 or min(shape) < 0:
+        raise ValueError(f"Invalid matrix shape: {text!r}")
+    return shape
+
+
+def matrix_from_buffer(buffer, shape, dtype="float64", offset=0, fortran_order=False):
+    """
+    Wrap a raw little-endian float buffer as a 2D array without copying.
+    Missing distances are expected as NaN.
+    """
+    import numpy as np
+
+    if dtype not in BINARY_DTYPES:
+        raise ValueError(f"Unsupported matrix dtype {dtype!r}, expected one of {', '.join(BINARY_DTYPES)}")
+    np_dtype = np.dtype(BINARY_DTYPES[dtype])
+
+    expected = shape[0] * shape[1] * np_dtype.itemsize
+    if len(buffer) - offset != expected:
+        raise ValueError(
+            f"Matrix buffer holds {len(buffer) - offset} bytes, "
+            f"shape {shape[0]}x{shape[1]} {dtype} needs {expected}"
+        )
+
+    flat = np.frombuffer(buffer, dtype=np_dtype, count=shape[0] * shape[1], offset=offset)
+    return flat.reshape(shape, order="F" if fortran_order else "C")
+
+
+def matrix_from_npy(buffer):
+    """
+    Wrap the contents of an .npy file (format 1.x-3.x) as a 2D array without
+    copying. Only the header is parsed; the data stays in `buffer`.
+    """
+    if buffer[:6] != NPY_MAGIC:
+        raise ValueError("Not an .npy file")
+
+    major = buffer[6]
+    if major == 1:
+        header_len = int.from_bytes(buffer[8:10], "little")
+        header_start = 10
+    elif major in (2, 3):
+        header_len = int.from_bytes(buffer[8:12], "little")
+        header_start = 12
+    else:
+        raise ValueError(f"Unsupported .npy version {major}")
+
+    header = ast.literal_eval(buffer[header_start:header_start + header_len].decode("latin1"))
+    descr = header["descr"]
+    dtype = next((name for name, code in BINARY_DTYPES.items() if code == descr), None)
+    if dtype is None:
+        raise ValueError(f"Unsupported .npy dtype {descr!r}, expected little-endian float32 or float64")
+    if len(header["shape"]) != 2:
+        raise ValueError(f"Cost matrix must be 2D, got shape {header['shape']}")
+
+    return matrix_from_buffer(
+        buffer,
+        tuple(header["shape"]),
+        dtype,
+        offset=header_start + header_len,
+        fortran_order=header["fortran_order"],
+    )
+
+
+def matrix_shape_error(matrix, rows, cols, axes="depots x customers"):
+    """
+    Error message when a cost matrix (nested lists or array) is not
+    rows x cols, otherwise None.
+    """
+    shape = getattr(matrix, "shape", None)
+    if shape is None:
+        widths = {len(row) for row in matrix} or {cols}
+        shape = (len(matrix), widths.pop() if len(widths) == 1 else None)
+    if tuple(shape) == (rows, cols):
+        return None
+    found = f"{shape[0]}x{shape[1]}" if shape[1] is not None else f"{shape[0]} rows of different lengths"
+    return f"costMatrix must be {rows}x{cols} ({axes}), got {found}"
+
+
+def read_solver_request(request):
+    """
+    Split a solver request into (payload dict, cost matrix). Three encodings:
+    - application/json: costMatrix as nested lists inside the payload
+    - multipart/form-data: JSON in the 'payload' field, costMatrix as an .npy file
+    - application/octet-stream: raw matrix body described by the X-Matrix-Shape
+      and X-Matrix-Dtype headers, no payload (use ?scenario_id=)
+    The matrix is None when the request does not carry one.
+    """
+    if request.mimetype == "application/octet-stream":
+        shape = request.headers.get("X-Matrix-Shape")
+        if not shape:
+            raise ValueError("Missing X-Matrix-Shape header")
+        matrix = matrix_from_buffer(
+            request.get_data(),
+            parse_shape(shape),
+            request.headers.get("X-Matrix-Dtype", "float64"),
+        )
+        return {}, matrix
+
+    if request.mimetype == "multipart/form-data":
+        data = json.loads(request.form.get("payload") or "{}")
+        upload = request.files.get("costMatrix")
+        matrix = matrix_from_npy(upload.read()) if upload is not None else data.get("costMatrix")
+        return data, matrix
+
+    data = request.get_json(force=True, silent=True) or {}
+    return data, data.get("costMatrix")
@@ -1,121 +1,270 @@
+import os
+import threading
+from collections import OrderedDict
+
 import pulp
 
-class MDVRPHeterogeneous:
-    def __init__(self, distance_matrix, depots, customers, demands, vehicles):
-        self.distance_matrix = distance_matrix
+
+class MDVRPModel:
+    """
+    The MDVRP MILP for one structure: node set, vehicle set and depot binding.
+    Distances, demands and capacities only appear as objective coefficients,
+    constraint coefficients and right-hand sides, so update() can re-price a
+    built model in place instead of generating it again.
+    """
+
+    def __init__(self, depots, customers, vehicle_depots):
+        """
+        vehicle_depots: dict vehicle id -> depot name
+        """
         self.depots = depots
         self.customers = customers
-        self.demands = demands
-        self.vehicles = vehicles
+        self.vehicle_depots = vehicle_depots
         self.nodes = depots + customers
-        self._validate_inputs()
+        self._depot_set = set(depots)
+        self._build()
 
-    def _validate_inputs(self):
-        missing = []
-        for i in self.nodes:
-            for j in self.nodes:
-                if (i, j) not in self.distance_matrix:
-                    missing.append((i, j))
-        if missing:
-            raise ValueError(f"Distance matrix missing {len(missing)} entries. Examples: {missing[:5]}")
-        for node in self.nodes:
-            if not isinstance(node, str):
-                raise ValueError(f"Node names must be strings, got {type(node)}: {node}")
+    @staticmethod
+    def signature(depots, customers, vehicles):
+        return (
+            tuple(depots),
+            tuple(customers),
+            tuple((v, info['depot']) for v, info in vehicles.items()),
+        )
 
     def _arc_allowed(self, i, j, v):
         """Only allow arcs that start/end at the vehicle's own depot or customers.
            No self-loops. No cross-depot moves."""
         if i == j:
             return False
-        depot_v = self.vehicles[v]['depot']
+        depot_v = self.vehicle_depots[v]
         # disallow leaving from other depots
-        if i in self.depots and i != depot_v:
+        if i in self._depot_set and i != depot_v:
             return False
         # disallow entering other depots
-        if j in self.depots and j != depot_v:
+        if j in self._depot_set and j != depot_v:
             return False
         return True
 
-    def solve(self):
+    def _build(self):
         prob = pulp.LpProblem("MDVRP_Heterogeneous", pulp.LpMinimize)
 
         # Vehicle activation
-        y = {v: pulp.LpVariable(f"y_{v}", 0, 1, pulp.LpBinary) for v in self.vehicles}
+        y = {v: pulp.LpVariable(f"y_{v}", 0, 1, pulp.LpBinary) for v in self.vehicle_depots}
 
-        # Decision variables x[i,j,v]
+        # Decision variables x[i,j,v]; a node name listed twice yields one variable
         x = {}
         for i in self.nodes:
             for j in self.nodes:
-                for v in self.vehicles:
-                    if self._arc_allowed(i, j, v):
+                for v in self.vehicle_depots:
+                    if (i, j, v) not in x and self._arc_allowed(i, j, v):
                         x[(i, j, v)] = pulp.LpVariable(f"x_{i}_{j}_{v}", 0, 1, pulp.LpBinary)
 
+        # The same variables indexed by head and tail per vehicle
+        arcs_into = {(n, v): [] for n in self.nodes for v in self.vehicle_depots}
+        arcs_out = {(n, v): [] for n in self.nodes for v in self.vehicle_depots}
+        for (i, j, v), var in x.items():
+            arcs_into[(j, v)].append(var)
+            arcs_out[(i, v)].append(var)
+
         # MTZ load variables (customers only)
         u = {(c, v): pulp.LpVariable(f"u_{c}_{v}", 0, None, pulp.LpContinuous)
-             for c in self.customers for v in self.vehicles}
+             for c in self.customers for v in self.vehicle_depots}
 
-        # Objective: minimize total distance
-        prob += pulp.lpSum(self.distance_matrix[i, j] * x[(i, j, v)]
-                           for (i, j, v) in x.keys())
+        # Objective: minimize total distance (coefficients set by update())
+        prob += pulp.lpSum(1 * var for var in x.values())
 
         # Each customer visited exactly once (incoming and outgoing across all vehicles)
         for c in self.customers:
-            prob += pulp.lpSum(x[(i, c, v)] for (i, j, v) in x if j == c) == 1
-            prob += pulp.lpSum(x[(c, j, v)] for (i, j, v) in x if i == c) == 1
+            prob += pulp.lpSum(var for v in self.vehicle_depots for var in arcs_into[(c, v)]) == 1
+            prob += pulp.lpSum(var for v in self.vehicle_depots for var in arcs_out[(c, v)]) == 1
 
         # Flow conservation per vehicle on customers
-        for v in self.vehicles:
+        for v in self.vehicle_depots:
             for c in self.customers:
-                prob += pulp.lpSum(x[(i, c, v)] for (i, j, vv) in x if vv == v and j == c) == \
-                        pulp.lpSum(x[(c, j, v)] for (i, j, vv) in x if vv == v and i == c)
+                prob += pulp.lpSum(arcs_into[(c, v)]) == pulp.lpSum(arcs_out[(c, v)])
 
         # Start/end at own depot once if vehicle is used
-        for v, info in self.vehicles.items():
-            d = info['depot']
+        for v, d in self.vehicle_depots.items():
             # departures from depot == y[v]
-            prob += pulp.lpSum(x[(d, j, v)] for (i, j, vv) in x if vv == v and i == d) == y[v]
+            prob += pulp.lpSum(arcs_out[(d, v)]) == y[v]
             # arrivals to depot == y[v]
-            prob += pulp.lpSum(x[(i, d, v)] for (i, j, vv) in x if vv == v and j == d) == y[v]
+            prob += pulp.lpSum(arcs_into[(d, v)]) == y[v]
 
-        # MTZ subtour elimination + capacity (per vehicle)
-        for v, info in self.vehicles.items():
-            Q = info['capacity']
+        # MTZ subtour elimination + capacity (per vehicle); Q and demands are
+        # placeholders here and set by update()
+        self.mtz = {}
+        self.load_lower = {}
+        self.load_upper = {}
+        for v in self.vehicle_depots:
             for i in self.customers:
                 for j in self.customers:
                     if i != j and (i, j, v) in x:
-                        prob += u[(i, v)] - u[(j, v)] + Q * x[(i, j, v)] <= Q - self.demands[j]
+                        constraint = u[(i, v)] - u[(j, v)] + x[(i, j, v)] <= 0
+                        prob += constraint
+                        self.mtz[(i, j, v)] = constraint
             # bounds link to visit
             for c in self.customers:
-                prob += u[(c, v)] >= self.demands[c] * pulp.lpSum(
-                    x[(i, c, v)] for (i, j, vv) in x if vv == v and j == c
-                )
-                prob += u[(c, v)] <= Q
+                constraint = u[(c, v)] - pulp.lpSum(arcs_into[(c, v)]) >= 0
+                prob += constraint
+                self.load_lower[(c, v)] = (constraint, arcs_into[(c, v)])
+                constraint = u[(c, v)] <= 0
+                prob += constraint
+                self.load_upper[(c, v)] = constraint
+
+        self.prob = prob
+        self.x = x
+        self.y = y
+        self.u = u
+
+    def update(self, distance_matrix, demands, capacities):
+        """
+        Set distances (objective), demands and capacities (vehicle id -> Q)
+        in place.
+        """
+        objective = self.prob.objective
+        for (i, j, v), var in self.x.items():
+            objective[var] = distance_matrix[i, j]
+
+        for (i, j, v), constraint in self.mtz.items():
+            Q = capacities[v]
+            # u_i - u_j + Q x_ijv <= Q - d_j
+            _set_coefficient(constraint, self.x[(i, j, v)], Q)
+            constraint.changeRHS(Q - demands[j])
+        for (c, v), (constraint, arcs) in self.load_lower.items():
+            # u_cv >= d_c * (visits of c by v)
+            for var in arcs:
+                _set_coefficient(constraint, var, -demands[c])
+        for (c, v), constraint in self.load_upper.items():
+            constraint.changeRHS(capacities[v])
+
+    def set_start(self, routes):
+        """
+        Use routes ([{"vehicle", "route": [names]}]) as the MIP start. Arcs
+        the model does not have (customers or vehicles gone) are skipped.
+        """
+        for var in self.x.values():
+            var.setInitialValue(0)
+        for var in self.y.values():
+            var.setInitialValue(0)
+        for r in routes:
+            v = str(r["vehicle"])
+            if v not in self.y:
+                continue
+            self.y[v].setInitialValue(1)
+            for i, j in zip(r["route"], r["route"][1:]):
+                var = self.x.get((i, j, v))
+                if var is not None:
+                    var.setInitialValue(1)
+
+    def solve(self, warm_start=False, time_limit=None):
+        self.prob.solve(pulp.PULP_CBC_CMD(msg=False, warmStart=warm_start, timeLimit=time_limit))
+        return self.prob.status
+
+
+def _set_coefficient(constraint, var, value):
+    # pulp >= 3 keeps the expression in .expr, older versions subclass it
+    getattr(constraint, "expr", constraint)[var] = value
+
 
-        # Solve
-        prob.solve(pulp.PULP_CBC_CMD(msg=False))
+# Built models by structural signature, most recently used last
+MODEL_CACHE_SIZE = int(os.environ.get("MDVRP_MODEL_CACHE_SIZE", 8))
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
+def _checkout_model(signature):
+    """
+    Take a cached model out of the cache, so concurrent solves never share one.
+    """
+    with _model_cache_lock:
+        return _model_cache.pop(signature, None)
+
+
+def _checkin_model(signature, model):
+    with _model_cache_lock:
+        _model_cache[signature] = model
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+
+
+class MDVRPHeterogeneous:
+    def __init__(self, distance_matrix, depots, customers, demands, vehicles):
+        self.distance_matrix = distance_matrix
+        self.depots = depots
+        self.customers = customers
+        self.demands = demands
+        self.vehicles = vehicles
+        self.nodes = depots + customers
+        self._validate_inputs()
+
+    def _validate_inputs(self):
+        missing = []
+        for i in self.nodes:
+            for j in self.nodes:
+                if (i, j) not in self.distance_matrix:
+                    missing.append((i, j))
+        if missing:
+            raise ValueError(f"Distance matrix missing {len(missing)} entries. Examples: {missing[:5]}")
+        for node in self.nodes:
+            if not isinstance(node, str):
+                raise ValueError(f"Node names must be strings, got {type(node)}: {node}")
+
+    def solve(self, time_limit=None, initial_routes=None):
+        """
+        Solve with a model from the per-process cache when one with the same
+        structure exists: only its parameters are updated and the previous
+        solution is passed to CBC as a warm start. initial_routes (e.g. a
+        stored plan of the scenario) replace that start when given.
+        time_limit (seconds) caps the CBC run; the best solution found so far
+        is returned with status "Feasible" unless CBC proved it optimal.
+        """
+        signature = MDVRPModel.signature(self.depots, self.customers, self.vehicles)
+        model = _checkout_model(signature)
+        reused = model is not None
+        if not reused:
+            model = MDVRPModel(self.depots, self.customers,
+                               {v: info['depot'] for v, info in self.vehicles.items()})
+        model.update(self.distance_matrix, self.demands,
+                     {v: info['capacity'] for v, info in self.vehicles.items()})
+        if initial_routes:
+            model.set_start(initial_routes)
+
+        try:
+            model.solve(warm_start=reused or bool(initial_routes), time_limit=time_limit)
+            return self._extract(model)
+        finally:
+            _checkin_model(signature, model)
+
+    def _extract(self, model):
+        prob, x = model.prob, model.x
+
+        # ---- Solution extraction: one pass into per-vehicle successor arrays ----
+        index = {n: k for k, n in enumerate(self.nodes)}
+        successor = {v: [-1] * len(self.nodes) for v in self.vehicles}
 
-        # ---- Debug arcs (optional) ----
         print("\n=== Active arcs ===")
         for (i, j, v), var in x.items():
-            if var.value() == 1:
+            value = var.varValue
+            if value is not None and value > 0.5:
+                successor[v][index[i]] = index[j]
                 print(f"Vehicle {v}: {i} -> {j}")
 
         # ---- Route reconstruction ----
         routes = []
         for v, info in self.vehicles.items():
-            d = info['depot']
-            arcs_v = {(i, j) for (i, j, vv) in x if vv == v and x[(i, j, v)].value() == 1}
-            if not arcs_v:
+            succ = successor[v]
+            d = index[info['depot']]
+            if succ[d] == -1:
                 continue
             # chain from depot
             route = [d]
             current = d
             seen = set()
             while True:
-                nexts = [j for (i, j) in arcs_v if i == current]
-                if not nexts:
+                nxt = succ[current]
+                if nxt == -1:
                     break
-                nxt = nexts[0]
                 route.append(nxt)
                 if nxt in seen:
                     break
@@ -124,10 +273,19 @@ class MDVRPHeterogeneous:
                 if current == d:
                     break
             if len(route) > 1:
-                routes.append({"vehicle": v, "route": route, "capacity": info['capacity']})
+                routes.append({"vehicle": v, "route": [self.nodes[k] for k in route], "capacity": info['capacity']})
+
+        # A run cut short by time_limit reports status Optimal with its incumbent;
+        # only sol_status tells a proven optimum from a merely feasible plan
+        proven_optimal = prob.sol_status == pulp.LpSolutionOptimal
+        if prob.sol_status == pulp.LpSolutionIntegerFeasible:
+            status = "Feasible"
+        else:
+            status = pulp.LpStatus[prob.status]
 
         return {
-            "status": pulp.LpStatus[prob.status],
+            "status": status,
+            "proven_optimal": proven_optimal,
             "total_cost": pulp.value(prob.objective),
             "routes": routes
         }
@@ -0,0 +1,140 @@
+import numpy as np
+
+from utilities import INF_REPLACE
+
+
+class RouteEvaluator:
+    """
+    Validates route sets against an MDVRP instance and recomputes their cost.
+
+    The instance is held as integer-indexed arrays (nodes = depots + customers),
+    so checking a route set is a handful of vectorized operations over all
+    stops: O(total stops) after the name -> index lookups.
+    """
+
+    def __init__(self, depots, customers, distance, demands, vehicles):
+        """
+        depots, customers: node names; node k is (depots + customers)[k]
+        distance: (N, N) array-like, distance[i][j] between node i and node j
+        demands: dict customer name -> demand
+        vehicles: dict vehicle id -> {"capacity": ..., "depot": depot name}
+        """
+        self.depots = list(depots)
+        self.customers = list(customers)
+        self.nodes = self.depots + self.customers
+        self.index = {n: k for k, n in enumerate(self.nodes)}
+
+        self.distance = np.asarray(distance, dtype=np.float64)
+        n = len(self.nodes)
+        if self.distance.shape != (n, n):
+            raise ValueError(f"Distance matrix must be {n}x{n}, got {self.distance.shape}")
+
+        self.demand = np.zeros(n)
+        for c in self.customers:
+            self.demand[self.index[c]] = demands.get(c, 0)
+        self.is_depot = np.zeros(n, dtype=bool)
+        self.is_depot[:len(self.depots)] = True
+
+        self.vehicle_ids = list(vehicles)
+        self.vehicle_index = {v: k for k, v in enumerate(self.vehicle_ids)}
+        self.vehicle_capacity = [vehicles[v]["capacity"] for v in self.vehicle_ids]
+        self.capacity = np.array(self.vehicle_capacity, dtype=np.float64)
+        self.vehicle_depot = np.array([self.index[vehicles[v]["depot"]] for v in self.vehicle_ids], dtype=np.int64)
+
+    @classmethod
+    def from_distance_dict(cls, depots, customers, distance_matrix, demands, vehicles):
+        """
+        Build from the name-keyed distance dict used by MDVRPHeterogeneous.
+        """
+        nodes = list(depots) + list(customers)
+        distance = [[distance_matrix[(i, j)] for j in nodes] for i in nodes]
+        return cls(depots, customers, distance, demands, vehicles)
+
+    def encode(self, routes):
+        """
+        Convert [{"vehicle": v, "route": [names]}] into (vehicle indices,
+        list of node index arrays). Raises KeyError on unknown names.
+        """
+        vehicles = np.array([self.vehicle_index[str(r["vehicle"])] for r in routes], dtype=np.int64)
+        stops = [np.array([self.index[n] for n in r["route"]], dtype=np.int64) for r in routes]
+        return vehicles, stops
+
+    def evaluate(self, routes):
+        """
+        Check and cost routes in the format returned by MDVRPHeterogeneous.solve.
+        """
+        try:
+            vehicles, stops = self.encode(routes)
+        except KeyError as e:
+            return {"feasible": False, "total_cost": None, "violations": [f"Unknown vehicle or node: {e.args[0]}"]}
+        return self.evaluate_indexed(vehicles, stops)
+
+    def evaluate_indexed(self, vehicles, routes):
+        """
+        vehicles: int array, vehicle index of each route
+        routes: list of int arrays, node indices of each route (depot first and last)
+        Returns feasibility, the list of violations, per-route cost and load and
+        the total cost.
+        """
+        vehicles = np.asarray(vehicles, dtype=np.int64)
+        violations = []
+        n_routes = len(routes)
+
+        if n_routes == 0:
+            missing = np.flatnonzero(~self.is_depot)
+            violations += [f"Customer {self.nodes[k]} is not visited" for k in missing]
+            return {"feasible": not violations, "total_cost": 0.0, "route_costs": [],
+                    "loads": [], "violations": violations}
+
+        lengths = np.array([len(r) for r in routes], dtype=np.int64)
+        if lengths.min() < 2:
+            violations.append("Routes must contain at least a depot start and end")
+            return {"feasible": False, "total_cost": None, "violations": violations}
+
+        stops = np.concatenate(routes)
+        route_of_stop = np.repeat(np.arange(n_routes), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        ends = starts + lengths - 1
+
+        # Arc costs: consecutive stops within the same route
+        same_route = route_of_stop[:-1] == route_of_stop[1:]
+        src, dst = stops[:-1][same_route], stops[1:][same_route]
+        arc_cost = self.distance[src, dst]
+        route_costs = np.bincount(route_of_stop[:-1][same_route], weights=arc_cost, minlength=n_routes)
+        for k in np.flatnonzero(arc_cost >= INF_REPLACE):
+            violations.append(f"Arc {self.nodes[src[k]]} -> {self.nodes[dst[k]]} is unreachable")
+
+        # Vehicles: each used at most once, within capacity
+        used = np.bincount(vehicles, minlength=len(self.vehicle_ids))
+        for k in np.flatnonzero(used > 1):
+            violations.append(f"Vehicle {self.vehicle_ids[k]} is used by {used[k]} routes")
+        loads = np.bincount(route_of_stop, weights=self.demand[stops], minlength=n_routes)
+        for r in np.flatnonzero(loads > self.capacity[vehicles] + 1e-9):
+            v = vehicles[r]
+            violations.append(f"Vehicle {self.vehicle_ids[v]} carries {loads[r]:g} over capacity {self.capacity[v]:g}")
+
+        # Depot binding: start and end at the vehicle's own depot, no depot in between
+        home = self.vehicle_depot[vehicles]
+        for r in np.flatnonzero((stops[starts] != home) | (stops[ends] != home)):
+            violations.append(f"Route of vehicle {self.vehicle_ids[vehicles[r]]} does not start and end at its depot")
+        interior = np.ones(len(stops), dtype=bool)
+        interior[starts] = False
+        interior[ends] = False
+        for r in np.unique(route_of_stop[interior & self.is_depot[stops]]):
+            violations.append(f"Route of vehicle {self.vehicle_ids[vehicles[r]]} passes through a depot")
+
+        # Every customer exactly once
+        visits = np.bincount(stops[~self.is_depot[stops]], minlength=len(self.nodes))
+        for k in np.flatnonzero((visits != 1) & ~self.is_depot):
+            if visits[k] == 0:
+                violations.append(f"Customer {self.nodes[k]} is not visited")
+            else:
+                violations.append(f"Customer {self.nodes[k]} is visited {visits[k]} times")
+
+        return {
+            "feasible": not violations,
+            "total_cost": float(route_costs.sum()),
+            "route_costs": route_costs.tolist(),
+            "loads": loads.tolist(),
+            "violations": violations,
+        }
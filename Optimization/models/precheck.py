@@ -0,0 +1,123 @@
+import numpy as np
+
+from utilities import INF_REPLACE
+
+
+def _reachable(finite, start, allowed):
+    """
+    Boolean mask of nodes reachable from `start` over finite arcs, moving
+    only through `allowed` nodes.
+    """
+    reached = np.zeros(len(allowed), dtype=bool)
+    reached[start] = True
+    frontier = reached.copy()
+    while frontier.any():
+        frontier = finite[frontier].any(axis=0) & allowed & ~reached
+        reached |= frontier
+    return reached
+
+
+def min_vehicles(capacities, total_demand):
+    """
+    Fewest vehicles whose capacities can add up to total_demand, or None
+    when even the whole fleet cannot.
+    """
+    if total_demand <= 0:
+        return 0
+    carried = 0.0
+    for k, capacity in enumerate(sorted(capacities, reverse=True), start=1):
+        carried += capacity
+        if carried >= total_demand - 1e-9:
+            return k
+    return None
+
+
+def precheck(evaluator, max_arcs=None):
+    """
+    Millisecond feasibility checks and a lower bound for the MDVRP instance
+    of a RouteEvaluator, without building the MILP.
+
+    Lower bound: every customer is entered and left exactly once and every
+    route returns to (and leaves) a depot, so the cost is at least the sum of
+    the cheapest finite arc into each customer plus one cheapest return arc
+    per route needed (and likewise for outgoing arcs); the larger of the two
+    is reported.
+    """
+    ev = evaluator
+    n_depots = len(ev.depots)
+    customers = np.arange(n_depots, len(ev.nodes))
+    demand = ev.demand[customers]
+    finite = ev.distance < INF_REPLACE
+    np.fill_diagonal(finite, False)
+
+    total_demand = float(demand.sum())
+    fleet_capacity = float(ev.capacity.sum())
+    max_capacity = float(ev.capacity.max()) if len(ev.capacity) else 0.0
+    issues = []
+
+    if total_demand > fleet_capacity + 1e-9:
+        issues.append(f"Total demand {total_demand:g} exceeds fleet capacity {fleet_capacity:g}")
+
+    oversized = [ev.nodes[k] for k in customers[demand > max_capacity + 1e-9]]
+    if oversized:
+        issues.append(f"{len(oversized)} customer(s) exceed the largest vehicle capacity {max_capacity:g}")
+
+    # A customer is reachable when some depot with vehicles can get there and back
+    home_depots = np.unique(ev.vehicle_depot)
+    served = np.zeros(len(ev.nodes), dtype=bool)
+    for d in home_depots:
+        allowed = ~ev.is_depot
+        allowed[d] = True
+        served |= _reachable(finite, d, allowed) & _reachable(finite.T, d, allowed)
+    unreachable = [ev.nodes[k] for k in customers[~served[customers]]]
+    if unreachable:
+        issues.append(f"{len(unreachable)} customer(s) cannot be reached from any depot with vehicles")
+
+    routes_needed = min_vehicles(ev.capacity, total_demand)
+    if len(customers) and routes_needed == 0:
+        routes_needed = 1
+    if routes_needed is None and not issues:
+        issues.append("The fleet cannot carry the total demand")
+
+    lower_bound = None
+    if not issues and len(customers):
+        # Arcs usable at all: between customers, or to/from a depot that has vehicles
+        usable = finite.copy()
+        depot_mask = np.zeros(len(ev.nodes), dtype=bool)
+        depot_mask[home_depots] = True
+        usable[ev.is_depot & ~depot_mask, :] = False
+        usable[:, ev.is_depot & ~depot_mask] = False
+        cost = np.where(usable, ev.distance, np.inf)
+
+        into = cost[:, customers].min(axis=0).sum()
+        out_of = cost[customers, :].min(axis=1).sum()
+        back = cost[np.ix_(customers, home_depots)].min()
+        leave = cost[np.ix_(home_depots, customers)].min()
+        lower_bound = float(max(into + routes_needed * back, out_of + routes_needed * leave))
+
+    # Size of the MILP MDVRPHeterogeneous would build: per vehicle, arcs among
+    # its depot and all customers
+    n_customers = len(customers)
+    arcs = len(ev.vehicle_ids) * n_customers * (n_customers + 1)
+
+    if issues:
+        recommendation = "reject"
+    elif max_arcs is not None and arcs > max_arcs:
+        recommendation = "heuristic"
+    else:
+        recommendation = "solve"
+
+    return {
+        "feasible": not issues,
+        "issues": issues,
+        "total_demand": total_demand,
+        "fleet_capacity": fleet_capacity,
+        "max_vehicle_capacity": max_capacity,
+        "min_vehicles": routes_needed,
+        "oversized_customers": oversized,
+        "unreachable_customers": unreachable,
+        "lower_bound": lower_bound,
+        "model_arcs": arcs,
+        "recommendation": recommendation,
+    }
+
@@ -0,0 +1,185 @@
+import numpy as np
+
+from utilities import INF_REPLACE
+
+
+class RouteRepair:
+    """
+    Incremental repair of an existing MDVRP plan after a few customers changed.
+
+    Works on the integer-indexed instance of a RouteEvaluator: routes are lists
+    of node indices (own depot first and last), keyed by vehicle index.
+    Changed customers are taken out of their routes and put back with
+    cheapest feasible insertion, then a bounded relocate search improves the
+    routes that were touched. Untouched routes are left exactly as they were.
+    """
+
+    def __init__(self, evaluator, max_moves=50):
+        self.ev = evaluator
+        self.max_moves = max_moves
+        self.routes = {}
+        self.touched = set()
+        self.unassigned = []
+
+    # ---------------- Setup ---------------- #
+
+    def load(self, routes, removed=(), repriced=()):
+        """
+        Take over a previous plan ([{"vehicle", "route": [names]}]). Customers
+        in `removed` are dropped. Routes whose vehicle is gone or has moved to
+        another depot are dissolved and their customers queued for insertion,
+        as are `repriced` customers whose route no longer fits its vehicle.
+        """
+        ev = self.ev
+        removed = set(removed)
+        repriced = set(repriced)
+
+        for r in routes:
+            names = [n for n in r["route"] if n not in removed]
+            v = ev.vehicle_index.get(str(r["vehicle"]))
+            customers = [ev.index[n] for n in names[1:-1] if n in ev.index]
+            if len(customers) != len(names) - 2 or len(names) < len(r["route"]):
+                self.touched.add(v)
+
+            depot = ev.index.get(names[0]) if names else None
+            if v is None or depot != ev.vehicle_depot[v] or v in self.routes:
+                self.unassigned += customers
+                continue
+            self.routes[v] = [depot] + customers + [depot]
+
+        for v, route in self.routes.items():
+            load = ev.demand[route].sum()
+            # Repriced customers leave first, largest demand first
+            movable = sorted(route[1:-1], key=lambda k: (ev.nodes[k] not in repriced, -ev.demand[k]))
+            while load > ev.capacity[v] + 1e-9 and movable:
+                k = movable.pop(0)
+                route.remove(k)
+                load -= ev.demand[k]
+                self.unassigned.append(k)
+                self.touched.add(v)
+
+        self.routes = {v: r for v, r in self.routes.items() if len(r) > 2}
+        self.touched.discard(None)
+
+    # ---------------- Moves ---------------- #
+
+    def _load(self, v):
+        return self.ev.demand[self.routes[v]].sum() if v in self.routes else 0.0
+
+    def _best_insertion(self, c, vehicles, skip=None, capacity=True):
+        """
+        Cheapest feasible (delta, vehicle, position) to insert customer c into
+        any of `vehicles`, or None. `skip` = (vehicle, position) of c itself,
+        whose neighbouring slots are excluded. capacity=False ignores loads.
+        """
+        D, ev = self.ev.distance, self.ev
+        best = None
+        for v in vehicles:
+            route = self.routes.get(v)
+            if route is None:
+                depot = ev.vehicle_depot[v]
+                route = [depot, depot]
+            load = self._load(v) - (ev.demand[c] if skip and skip[0] == v else 0.0)
+            if capacity and load + ev.demand[c] > ev.capacity[v] + 1e-9:
+                continue
+            a = np.asarray(route)
+            delta = D[a[:-1], c] + D[c, a[1:]] - D[a[:-1], a[1:]]
+            delta[(D[a[:-1], c] >= INF_REPLACE) | (D[c, a[1:]] >= INF_REPLACE)] = np.inf
+            if skip and skip[0] == v:
+                delta[max(skip[1] - 1, 0):skip[1] + 1] = np.inf
+            pos = int(np.argmin(delta))
+            if np.isfinite(delta[pos]) and (best is None or delta[pos] < best[0]):
+                best = (float(delta[pos]), v, pos + 1)
+        return best
+
+    def _insert(self, c, v, pos):
+        if v not in self.routes:
+            depot = self.ev.vehicle_depot[v]
+            self.routes[v] = [depot, depot]
+        self.routes[v].insert(pos, c)
+        self.touched.add(v)
+
+    def reference_cost(self, customers=()):
+        """
+        Cost of the loaded plan plus the cheapest insertion of each queued and
+        given customer into it, ignoring capacities: what the changes cost at
+        least while the rest of the plan stays put. Call before insert_all().
+        """
+        D = self.ev.distance
+        cost = sum(float(D[r[:-1], r[1:]].sum()) for r in map(np.asarray, self.routes.values()))
+        all_vehicles = range(len(self.ev.vehicle_ids))
+        for c in set(self.unassigned) | set(customers):
+            best = self._best_insertion(c, all_vehicles, capacity=False)
+            if best is not None:
+                cost += best[0]
+        return cost
+
+    def insert_all(self, customers=()):
+        """
+        Cheapest feasible insertion of the queued and given customers, largest
+        demand first. Returns the customers that fit nowhere.
+        """
+        pending = sorted(set(self.unassigned) | set(customers), key=lambda k: -self.ev.demand[k])
+        self.unassigned = []
+        failed = []
+        all_vehicles = range(len(self.ev.vehicle_ids))
+        for c in pending:
+            best = self._best_insertion(c, all_vehicles)
+            if best is None:
+                failed.append(c)
+            else:
+                self._insert(c, best[1], best[2])
+        return failed
+
+    def relocate(self):
+        """
+        Bounded local repair: repeatedly move the single customer of a touched
+        route whose relocation (within or across touched routes) saves the
+        most, for at most max_moves moves. Returns the number of moves made.
+        """
+        D = self.ev.distance
+        moves = 0
+        while moves < self.max_moves:
+            touched = [v for v in self.touched if v in self.routes]
+            best = None
+            for v in touched:
+                route = self.routes[v]
+                for pos in range(1, len(route) - 1):
+                    p, c, n = route[pos - 1], route[pos], route[pos + 1]
+                    gain = D[p, c] + D[c, n] - D[p, n]
+                    ins = self._best_insertion(c, touched, skip=(v, pos))
+                    if ins is not None and gain - ins[0] > 1e-9 and (best is None or gain - ins[0] > best[0]):
+                        best = (gain - ins[0], v, pos, ins[1], ins[2])
+            if best is None:
+                break
+
+            _, v, pos, target, target_pos = best
+            c = self.routes[v].pop(pos)
+            if target == v and target_pos > pos:
+                target_pos -= 1
+            self.routes[target].insert(target_pos, c)
+            if len(self.routes[v]) == 2:
+                del self.routes[v]
+            moves += 1
+        return moves
+
+    # ---------------- Result ---------------- #
+
+    def result_routes(self):
+        ev = self.ev
+        return [
+            {
+                "vehicle": ev.vehicle_ids[v],
+                "route": [ev.nodes[k] for k in self.routes[v]],
+                "capacity": ev.vehicle_capacity[v],
+            }
+            for v in sorted(self.routes)
+            if len(self.routes[v]) > 2
+        ]
+
+    def evaluate(self):
+        vehicles = sorted(v for v in self.routes if len(self.routes[v]) > 2)
+        return self.ev.evaluate_indexed(
+            np.array(vehicles, dtype=np.int64),
+            [np.array(self.routes[v], dtype=np.int64) for v in vehicles],
+        )
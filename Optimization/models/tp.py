@@ -1,3 +1,7 @@
+import os
+import threading
+from collections import OrderedDict
+
 from pulp import *
 import numpy as np
 from typing import Dict, List, Any, Optional
@@ -9,37 +13,38 @@ class transportationProblem:
         self.supply = supply
         self.solution = None
         self.x = None 
+        self._solution_json = None
 
     def get_cost_dict(self):
         return makeDict([self.supply.keys(), self.demand.keys()], self.costMatrix, 0)
 
     def solve(self):
-        prob = LpProblem("Transportation Problem", LpMinimize)
-        self.prob = prob
-
-        self.x = LpVariable.dicts(
-            "x",
-            ((i, j) for i in self.supply.keys() for j in self.demand.keys()),
-            0,
-            None,
-            LpInteger
-        )
+        """
+        Reuse a built model for the same supply/demand keys when one is
+        cached: costs and right-hand sides are updated in place and the
+        previous solution is the warm start.
+        """
+        signature = (tuple(self.supply.keys()), tuple(self.demand.keys()))
+        model = _checkout_model(signature)
+        reused = model is not None
+        if not reused:
+            model = TransportationModel(list(self.supply.keys()), list(self.demand.keys()))
+        model.update(self.get_cost_dict(), self.demand, self.supply)
 
-        routes = [(i, j) for i in self.supply.keys() for j in self.demand.keys()]
-        costs = self.get_cost_dict()
-
-        prob += lpSum([costs[i][j] * self.x[i, j] for (i, j) in routes])
-
-        for i in self.supply.keys():
-            prob += lpSum([self.x[i, j] for j in self.demand.keys()]) <= self.supply[i]
-
-        for j in self.demand.keys():
-            prob += lpSum([self.x[i, j] for i in self.supply.keys()]) == self.demand[j]
-
-        prob.solve()
-        self.solution = prob
+        try:
+            model.prob.solve(PULP_CBC_CMD(warmStart=reused))
+            self.prob = model.prob
+            self.x = model.x
+            self.solution = model.prob
+            # Snapshot now: the cached model is re-priced by the next solve
+            self._solution_json = self._build_solution_json()
+        finally:
+            _checkin_model(signature, model)
 
     def get_solution_json(self):
+        return self._solution_json
+
+    def _build_solution_json(self):
         solution = {
             "status": LpStatus[self.prob.status],
             "total_cost": value(self.prob.objective),
@@ -56,3 +61,64 @@ class transportationProblem:
                         "quantity": int(var.varValue)
                     })
         return solution
+
+
+class TransportationModel:
+    """
+    Transportation LP for a fixed set of sources and sinks. Costs are
+    objective coefficients and supply/demand are right-hand sides, so
+    update() re-prices the model without rebuilding it.
+    """
+
+    def __init__(self, sources, sinks):
+        prob = LpProblem("Transportation Problem", LpMinimize)
+
+        self.x = LpVariable.dicts(
+            "x",
+            ((i, j) for i in sources for j in sinks),
+            0,
+            None,
+            LpInteger
+        )
+
+        prob += lpSum([1 * self.x[i, j] for i in sources for j in sinks])
+
+        self.supply_constraints = {}
+        for i in sources:
+            constraint = lpSum([self.x[i, j] for j in sinks]) <= 0
+            prob += constraint
+            self.supply_constraints[i] = constraint
+
+        self.demand_constraints = {}
+        for j in sinks:
+            constraint = lpSum([self.x[i, j] for i in sources]) == 0
+            prob += constraint
+            self.demand_constraints[j] = constraint
+
+        self.prob = prob
+
+    def update(self, costs, demand, supply):
+        for (i, j), var in self.x.items():
+            self.prob.objective[var] = costs[i][j]
+        for i, constraint in self.supply_constraints.items():
+            constraint.changeRHS(supply[i])
+        for j, constraint in self.demand_constraints.items():
+            constraint.changeRHS(demand[j])
+
+
+# Built models by (sources, sinks), most recently used last
+MODEL_CACHE_SIZE = int(os.environ.get("TP_MODEL_CACHE_SIZE", 8))
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
+def _checkout_model(signature):
+    with _model_cache_lock:
+        return _model_cache.pop(signature, None)
+
+
+def _checkin_model(signature, model):
+    with _model_cache_lock:
+        _model_cache[signature] = model
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
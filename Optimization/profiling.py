@@ -0,0 +1,220 @@
+# profiling.py
+"""
+Opt-in request profiling.
+
+With PROFILING=1 the views wrapped by @profiled run under cProfile when the
+request carries "X-Profile: 1", or at random with probability
+PROFILE_SAMPLE_RATE. Solver jobs sent through the runner from job_runner()
+are profiled inside the worker as well and merged into the same profile, so
+it covers request parsing, utilities transforms, model build, solve and
+serialization. Each profile is written to PROFILE_DIR as <name>.prof (pstats)
+with a <name>.json summary that records the sha256 of the payload.
+
+Without PROFILING=1, profiled() returns the view unchanged and job_runner()
+returns pool.run itself: no wrapper is ever called.
+"""
+import contextvars
+import cProfile
+import datetime
+import functools
+import hashlib
+import io
+import json
+import os
+import pstats
+import random
+import time
+
+ENABLED = os.environ.get("PROFILING", "").lower() in ("1", "true", "yes")
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "../data/profiles"))
+PROFILE_HEADER = "X-Profile"
+
+_session = contextvars.ContextVar("profile_session", default=None)
+
+
+class _WorkerStats:
+    """
+    Stats dict of a worker profile, in the form pstats.Stats.add() accepts.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfileSession:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.worker_stats = []
+
+    def stats(self):
+        stats = pstats.Stats(self.profile)
+        for worker in self.worker_stats:
+            stats.add(_WorkerStats(worker))
+        return stats
+
+
+# ---------------- Worker side ---------------- #
+
+def profiled_job(fn, *args):
+    """
+    Run fn(*args) under cProfile in a worker; returns (result, raw stats).
+    """
+    profile = cProfile.Profile()
+    result = profile.runcall(fn, *args)
+    profile.create_stats()
+    return result, profile.stats
+
+
+# ---------------- API side ---------------- #
+
+def job_runner(pool):
+    """
+    Callable with the signature of pool.run that profiles the job in its
+    worker when the current request is being profiled.
+    """
+    if not ENABLED:
+        return pool.run
+
+    def run(fn, *args, timeout=None):
+        session = _session.get()
+        if session is None:
+            return pool.run(fn, *args, timeout=timeout)
+        result, stats = pool.run(profiled_job, fn, *args, timeout=timeout)
+        session.worker_stats.append(stats)
+        return result
+
+    return run
+
+
+def _wanted(request):
+    if request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+
+
+def profiled(view):
+    """
+    Decorator for Flask views (place it below @app.route).
+    """
+    if not ENABLED:
+        return view
+
+    from flask import request
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _wanted(request):
+            return view(*args, **kwargs)
+
+        session = ProfileSession()
+        try:
+            session.profile.enable()
+        except ValueError:
+            # another profiler is active in this process
+            return view(*args, **kwargs)
+        token = _session.set(session)
+        started = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            session.profile.disable()
+            elapsed = time.perf_counter() - started
+            _session.reset(token)
+            try:
+                save_profile(session, request, elapsed)
+            except Exception as e:
+                print("PROFILE ERROR:", e)
+
+    return wrapper
+
+
+def _payload_digest(request):
+    """
+    sha256 and size of the request payload. Form parsing consumes the raw
+    body of multipart requests, so those are hashed from their parsed form
+    fields and uploaded files instead.
+    """
+    digest = hashlib.sha256()
+    size = len(request.query_string)
+    if request.files or request.form:
+        for key, value in sorted(request.form.items(multi=True)):
+            part = f"{key}={value}".encode()
+            digest.update(part)
+            size += len(part)
+        for key, upload in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"{key}:{upload.filename}".encode())
+            upload.stream.seek(0)
+            for block in iter(lambda: upload.stream.read(1 << 16), b""):
+                digest.update(block)
+                size += len(block)
+            upload.stream.seek(0)
+    else:
+        body = request.get_data(cache=True)
+        digest.update(body)
+        size += len(body)
+    digest.update(request.query_string)
+    return digest.hexdigest(), size
+
+
+def save_profile(session, request, elapsed):
+    digest, payload_bytes = _payload_digest(request)
+    now = datetime.datetime.now()
+    name = f"{now.strftime('%Y%m%d%H%M%S%f')}-{request.endpoint}-{digest[:12]}"
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stats = session.stats()
+    stats.dump_stats(os.path.join(PROFILE_DIR, name + ".prof"))
+
+    summary = {
+        "name": name,
+        "created_at": now.isoformat(timespec="seconds"),
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "payload_sha256": digest,
+        "payload_bytes": payload_bytes,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "worker_jobs": len(session.worker_stats),
+        "total_calls": stats.total_calls,
+    }
+    with open(os.path.join(PROFILE_DIR, name + ".json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+
+
+# ---------------- Stored profiles ---------------- #
+
+def list_profiles():
+    """
+    Summaries of the stored profiles, newest first.
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if filename.endswith(".json"):
+            with open(os.path.join(PROFILE_DIR, filename), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def profile_path(name):
+    """
+    Path of a stored .prof file, or None when there is no profile `name`.
+    """
+    if os.path.basename(name) != name:
+        return None
+    path = os.path.join(PROFILE_DIR, name + ".prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_report(name, sort="cumulative", limit=50):
+    path = profile_path(name)
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,132 @@
+# scenario_repository.py
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+
+@dataclass
+class Depot:
+    id: int
+    scenario_id: int
+    depot_name: str
+    depot_x: float
+    depot_y: float
+    capacity: Optional[int]
+    max_distance: Optional[int]
+    type: Optional[str]
+
+
+@dataclass
+class Customer:
+    id: int
+    scenario_id: int
+    customer_name: str
+    customer_x: float
+    customer_y: float
+    demand: int
+
+
+@dataclass
+class Vehicle:
+    id: int
+    scenario_id: int
+    capacity: int
+    depot_id: int
+
+
+@dataclass
+class Scenario:
+    id: int
+    name: str
+    date: str
+    depots: List[Depot] = field(default_factory=list)
+    customers: List[Customer] = field(default_factory=list)
+    vehicles: List[Vehicle] = field(default_factory=list)
+
+    def depot_dicts(self):
+        return [asdict(d) for d in self.depots]
+
+    def customer_dicts(self):
+        return [asdict(c) for c in self.customers]
+
+    def vehicle_dicts(self):
+        return [asdict(v) for v in self.vehicles]
+
+    def to_dict(self):
+        """
+        Same shape as the /scenarios_by_id response.
+        """
+        return {
+            "scenario_id": self.id,
+            "name": self.name,
+            "date": self.date,
+            "customers": self.customer_dicts(),
+            "vehicles": self.vehicle_dicts(),
+            "depots": self.depot_dicts()
+        }
+
+
+def scenario_from_rows(rows):
+    """
+    Build a Scenario from the rows of DataHandler.get_scenario_rows.
+    Returns None when the scenario row itself is missing.
+    """
+    scenario = None
+    depots, customers, vehicles = [], [], []
+
+    for kind, row_id, c1, c2, c3, c4, c5, c6 in rows:
+        if kind == "scenario":
+            scenario = Scenario(row_id, c1, c2)
+        elif kind == "depot":
+            depots.append(Depot(row_id, None, c1, c2, c3, c4, c5, c6))
+        elif kind == "customer":
+            customers.append(Customer(row_id, None, c1, c2, c3, c4))
+        elif kind == "vehicle":
+            # The vehicles table's fourth column holds the depot id
+            vehicles.append(Vehicle(row_id, None, c1, c2))
+
+    if scenario is None:
+        return None
+
+    for item in depots + customers + vehicles:
+        item.scenario_id = scenario.id
+    scenario.depots = depots
+    scenario.customers = customers
+    scenario.vehicles = vehicles
+    return scenario
+
+
+class ScenarioRepository:
+    """
+    Read-through cache of fully hydrated scenarios with LRU eviction.
+    Entries are tagged with the scenario version from DataHandler and are
+    reloaded as soon as the version moves on, so every DataHandler write
+    (from this process or another) invalidates them.
+    """
+
+    def __init__(self, db, max_size=128):
+        self.db = db
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scenario_id):
+        version = self.db.get_version(scenario_id)
+
+        with self._lock:
+            entry = self._cache.get(scenario_id)
+            if entry is not None and entry[0] == version:
+                self._cache.move_to_end(scenario_id)
+                return entry[1]
+
+        scenario = scenario_from_rows(self.db.get_scenario_rows(scenario_id))
+        if scenario is None:
+            return None
+
+        with self._lock:
+            self._cache[scenario_id] = (version, scenario)
+            self._cache.move_to_end(scenario_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return scenario
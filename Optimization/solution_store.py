@@ -0,0 +1,271 @@
+# solution_store.py
+import datetime
+import hashlib
+import json
+import sys
+from array import array
+
+from utilities import INF_REPLACE
+
+# Columns of the solutions table without the packed BLOBs
+SUMMARY_COLUMNS = (
+    "id", "scenario_id", "created_at", "problem", "status", "solver_mode", "distance_mode",
+    "total_cost", "solve_ms", "total_ms", "input_hash", "scenario_version",
+)
+
+# Columns read for warm starts and repairs
+PLAN_COLUMNS = SUMMARY_COLUMNS + ("routes", "demands")
+
+# Solutions that can seed a warm start or an incremental repair; "Feasible"
+# is a time-limited solve's incumbent, a valid plan but not a proven optimum
+USABLE_STATUSES = ("Optimal", "Feasible", "Repaired")
+
+
+# ---------------- Packing ---------------- #
+# Blobs are little-endian arrays:
+#   mdvrp routes:  int64 per route: vehicle id, stop count, stops
+#                  (depots as -depot id, customers as +customer id)
+#   mdvrp demands: float64, demand of each customer stop in route order
+#   tp routes:     int64 triples: depot id, customer id, quantity
+#   cost matrix:   float64, the depot x customer matrix row by row, stored once
+#                  per input hash in the cost_matrices table
+
+def _pack(typecode, values):
+    data = array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack(typecode, blob):
+    data = array(typecode)
+    if blob:
+        data.frombytes(blob)
+        if sys.byteorder == "big":
+            data.byteswap()
+    return data
+
+
+def input_hash(*parts):
+    """
+    sha256 over the solver inputs: arrays by their bytes, anything else as
+    canonical JSON.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, "tobytes"):
+            digest.update(part.tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def encode_routes(scenario, routes):
+    """
+    Pack [{"vehicle", "route": [names]}] with the scenario's ids. Returns the
+    routes and demands blobs.
+    """
+    depot_ids = {}
+    for d in scenario.depots:
+        depot_ids.setdefault(d.depot_name.strip(), d.id)
+    customers = {}
+    for c in scenario.customers:
+        customers.setdefault(c.customer_name.strip(), c)
+
+    packed, demands = [], []
+    for r in routes:
+        stops = []
+        for name in r["route"]:
+            if name in depot_ids:
+                stops.append(-depot_ids[name])
+            elif name in customers:
+                stops.append(customers[name].id)
+                demands.append(customers[name].demand)
+            else:
+                raise ValueError(f"Route stop {name!r} is not in scenario {scenario.id}")
+        packed += [int(r["vehicle"]), len(stops)] + stops
+    return _pack("q", packed), _pack("d", demands)
+
+
+def decode_routes(scenario, routes_blob, demands_blob):
+    """
+    Unpack routes with the scenario's current names. Returns (routes,
+    demands by customer name at solve time). Rows deleted since are named
+    "depot <id>" / "customer <id>".
+    """
+    depot_names = {d.id: d.depot_name.strip() for d in scenario.depots}
+    customer_names = {c.id: c.customer_name.strip() for c in scenario.customers}
+    capacities = {v.id: v.capacity for v in scenario.vehicles}
+
+    packed = _unpack("q", routes_blob)
+    stop_demands = iter(_unpack("d", demands_blob))
+    routes, demands = [], {}
+    k = 0
+    while k < len(packed):
+        vehicle, length = packed[k], packed[k + 1]
+        names = []
+        for ref in packed[k + 2:k + 2 + length]:
+            if ref < 0:
+                names.append(depot_names.get(-ref, f"depot {-ref}"))
+            else:
+                name = customer_names.get(ref, f"customer {ref}")
+                names.append(name)
+                demands[name] = next(stop_demands)
+        routes.append({"vehicle": str(vehicle), "route": names, "capacity": capacities.get(vehicle)})
+        k += 2 + length
+    return routes, demands
+
+
+def encode_shipments(scenario, shipments):
+    depot_ids = {}
+    for d in scenario.depots:
+        depot_ids.setdefault(d.depot_name, d.id)
+    customer_ids = {}
+    for c in scenario.customers:
+        customer_ids.setdefault(c.customer_name, c.id)
+
+    packed = []
+    for s in shipments:
+        packed += [depot_ids[s["from"]], customer_ids[s["to"]], int(s["quantity"])]
+    return _pack("q", packed)
+
+
+def decode_shipments(scenario, blob):
+    depot_names = {d.id: d.depot_name for d in scenario.depots}
+    customer_names = {c.id: c.customer_name for c in scenario.customers}
+
+    packed = _unpack("q", blob)
+    return [
+        {
+            "from": depot_names.get(packed[k], f"depot {packed[k]}"),
+            "to": customer_names.get(packed[k + 1], f"customer {packed[k + 1]}"),
+            "quantity": packed[k + 2],
+        }
+        for k in range(0, len(packed), 3)
+    ]
+
+
+# ---------------- Store ---------------- #
+
+class SolutionStore:
+    """
+    Solver results per scenario in the solutions table: plan history for the
+    UI and the starting point of warm starts and incremental repairs.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def record(self, scenario, problem, result, solver_mode, distance_mode=None, timings=None,
+               input_hash=None, scenario_version=None):
+        """
+        Row values for one result of MDVRPHeterogeneous.solve / repair
+        (problem "mdvrp") or transportationProblem (problem "tp").
+        """
+        if problem == "mdvrp":
+            routes, demands = encode_routes(scenario, result.get("routes", []))
+        else:
+            routes, demands = encode_shipments(scenario, result.get("shipments", [])), None
+
+        timings = timings or {}
+        if scenario_version is None:
+            scenario_version = self.db.get_version(scenario.id)
+        return (
+            None,
+            scenario.id,
+            datetime.datetime.now().isoformat(timespec="seconds"),
+            problem,
+            result.get("status"),
+            solver_mode,
+            distance_mode,
+            result.get("total_cost"),
+            timings.get("solve_ms"),
+            timings.get("total_ms"),
+            input_hash,
+            scenario_version,
+            routes,
+            demands,
+        )
+
+    def save(self, scenario, problem, result, solver_mode, cost_matrix=None, **kwargs):
+        """
+        Store one result; returns its solution id. A cost_matrix the solve used
+        (no distance_mode) is stored under the input_hash, once per hash.
+        """
+        input_hash = kwargs.get("input_hash")
+        if cost_matrix is not None and kwargs.get("distance_mode") is None and input_hash is not None:
+            self.save_cost_matrix(input_hash, cost_matrix)
+        return self.db.insert("solutions", self.record(scenario, problem, result, solver_mode, **kwargs))
+
+    def save_many(self, records):
+        """
+        Store rows built by record() in one transaction.
+        """
+        return self.db.insert_many("solutions", records)
+
+    def save_cost_matrix(self, input_hash, cost_matrix):
+        import numpy as np
+
+        # None (JSON) converts to NaN
+        matrix = np.array(cost_matrix, dtype="<f8")
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(matrix), -1)
+        matrix[np.isnan(matrix)] = INF_REPLACE
+        self.db.save_cost_matrix(input_hash, matrix.shape[0], matrix.shape[1], matrix.tobytes())
+
+    def cost_matrix(self, solution):
+        """
+        The depot x customer cost matrix a stored solution was solved with, as
+        a float64 array, or None when it used a distance_mode.
+        """
+        import numpy as np
+
+        if solution.get("input_hash") is None:
+            return None
+        stored = self.db.get_cost_matrix(solution["input_hash"])
+        if stored is None:
+            return None
+        rows, cols, data = stored
+        return np.frombuffer(data, dtype="<f8").reshape(rows, cols)
+
+    def _decode(self, scenario, row):
+        solution = dict(zip(SUMMARY_COLUMNS, row[:len(SUMMARY_COLUMNS)]))
+        routes, demands = row[len(SUMMARY_COLUMNS):]
+        if solution["problem"] == "mdvrp":
+            solution["routes"], solution["demands"] = decode_routes(scenario, routes, demands)
+        else:
+            solution["shipments"] = decode_shipments(scenario, routes)
+        return solution
+
+    def latest(self, scenario, problem="mdvrp", usable=True):
+        """
+        Newest stored solution of the scenario, decoded; with usable=True only
+        one with a status in USABLE_STATUSES.
+        """
+        statuses = USABLE_STATUSES if usable else None
+        rows = self.db.get_solutions(scenario.id, problem, limit=1, statuses=statuses,
+                                     columns=", ".join(PLAN_COLUMNS))
+        return self._decode(scenario, rows[0]) if rows else None
+
+    def get(self, solution_id, load_scenario):
+        """
+        One solution, decoded with the scenario returned by
+        load_scenario(scenario_id) (e.g. ScenarioRepository.get). None when
+        either is missing.
+        """
+        row = self.db.get_by_id("solutions", solution_id)
+        if row is None:
+            return None
+        scenario = load_scenario(row[1])
+        return self._decode(scenario, row) if scenario is not None else None
+
+    def history(self, scenario_id, problem=None, limit=50, before_id=None):
+        """
+        Newest-first summaries (no routes) of a scenario's solutions.
+        """
+        rows = self.db.get_solutions(scenario_id, problem, limit, before_id, columns=", ".join(SUMMARY_COLUMNS))
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in rows]
+
+    def delete_for_scenario(self, scenario_id):
+        self.db.delete_by_id("solutions", scenario_id, column="scenario_id")
+        self.db.delete_unused_cost_matrices()
@@ -0,0 +1,273 @@
+# solver_pool.py
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_WORKERS = int(os.environ.get("SOLVER_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+
+# ---------------- Worker side ---------------- #
+
+def _init_worker():
+    """
+    Runs once per worker process: point CBC's temp files at a RAM-backed
+    directory when there is one, then import the solver stack so it stays
+    resident for every job this worker runs.
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        os.environ["TMPDIR"] = "/dev/shm"
+
+    import numpy
+    import pulp
+    import models.MDVRP
+    import models.tp
+    import distance_engine
+
+    # Keep the road graph resident too, once its CH index has been built
+    graph = os.environ.get("ROAD_GRAPH_PATH")
+    if graph and os.path.exists(distance_engine.index_path_for(graph)):
+        distance_engine.get_road_network(graph)
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def solve_mdvrp_job(depots, customers, vehicles, cost_matrix, distance_mode=None, time_limit=None,
+                    initial_routes=None):
+    """
+    Build the MDVRP inputs from API-shaped depots/customers/vehicles, then solve.
+    Distances come from the depot x customer cost matrix (customer pairs
+    planar), or, when distance_mode is set, entirely from distance_engine.
+    time_limit caps the CBC run in seconds; initial_routes is a previous plan
+    to warm-start from.
+    """
+    from utilities import build_vehicles_dict, build_distance_matrix, distance_dict_from_matrix
+    from models.MDVRP import MDVRPHeterogeneous
+
+    # Clean depot and customer names
+    depot_names = [d["depot_name"].strip() for d in depots]
+    customer_names = [c["customer_name"].strip() for c in customers]
+
+    # Build demands dict
+    demands = {c["customer_name"].strip(): c["demand"] for c in customers}
+
+    # Build vehicles dict
+    vehicles_dict = build_vehicles_dict(vehicles, depots)
+
+    # Build distance matrix
+    if distance_mode is not None:
+        from distance_engine import build_node_matrix
+        node_matrix = build_node_matrix(depots, customers, distance_mode)
+        distance_matrix = distance_dict_from_matrix(depots, customers, node_matrix)
+    else:
+        distance_matrix = build_distance_matrix(depots, customers, cost_matrix)
+
+    # ---------------- Debug ---------------- #
+    print("Depot names:", depot_names)
+    print("Customer names:", customer_names)
+    print("Demands:", demands)
+    print("Vehicles dict:", vehicles_dict)
+    print("Distance matrix sample:", distance_matrix)
+    # -------------------------------------- #
+
+    problem = MDVRPHeterogeneous(distance_matrix, depot_names, customer_names, demands, vehicles_dict)
+    return problem.solve(time_limit=time_limit, initial_routes=initial_routes)
+
+
+def repair_mdvrp_job(previous, depots, customers, vehicles, cost_matrix=None,
+                     distance_mode=None, max_degradation=0.15, max_moves=50):
+    """
+    Bring a previous MDVRP plan up to date with the current scenario without
+    re-solving: customers that were added, removed or whose demand changed
+    since `previous` are re-inserted with cheapest feasible insertion, then the
+    touched routes get a bounded relocate search.
+
+    previous: {"routes", "total_cost", "demands": {customer: demand}}
+    Returns the repaired plan with "cost_delta" (relative to the previous
+    cost) and "degradation": the cost above "reference_cost", the previous
+    plan with every changed customer at its cheapest spot regardless of
+    capacity. Far-away new customers raise the reference as much as the plan,
+    so only a repair that had to settle for worse placements degrades it.
+    "needs_full_solve" is set when the repair is infeasible or degrades the
+    plan by more than max_degradation.
+    """
+    from utilities import build_vehicles_dict
+    from distance_engine import build_node_matrix, node_matrix_from_cost
+    from models.evaluation import RouteEvaluator
+    from models.repair import RouteRepair
+
+    depot_names = [d["depot_name"].strip() for d in depots]
+    customer_names = [c["customer_name"].strip() for c in customers]
+    demands = {c["customer_name"].strip(): c["demand"] for c in customers}
+
+    if distance_mode is not None:
+        node_matrix = build_node_matrix(depots, customers, distance_mode)
+    else:
+        node_matrix = node_matrix_from_cost(depots, customers, cost_matrix)
+    evaluator = RouteEvaluator(
+        depot_names, customer_names, node_matrix, demands, build_vehicles_dict(vehicles, depots)
+    )
+
+    old_demands = previous["demands"]
+    inserted = [c for c in customer_names if c not in old_demands]
+    removed = [c for c in old_demands if c not in demands]
+    repriced = [c for c in customer_names if c in old_demands and old_demands[c] != demands[c]]
+
+    repair = RouteRepair(evaluator, max_moves=max_moves)
+    repair.load(previous["routes"], removed=removed, repriced=repriced)
+    # Customers the previous plan left out (or lost with a vehicle) go back in as well
+    served = {k for route in repair.routes.values() for k in route}
+    missing = [evaluator.index[c] for c in customer_names if evaluator.index[c] not in served]
+    reference_cost = repair.reference_cost(missing)
+    failed = repair.insert_all(missing)
+    moves = repair.relocate()
+    evaluation = repair.evaluate()
+
+    total_cost = evaluation["total_cost"]
+    previous_cost = previous.get("total_cost") or 0.0
+    degradation = None
+    if total_cost is not None and reference_cost > 0:
+        degradation = (total_cost - reference_cost) / reference_cost
+
+    needs_full_solve = bool(failed) or not evaluation["feasible"] or (
+        degradation is not None and degradation > max_degradation
+    )
+
+    return {
+        "status": "Repaired" if evaluation["feasible"] else "Infeasible",
+        "total_cost": total_cost,
+        "cost_delta": None if total_cost is None else total_cost - previous_cost,
+        "reference_cost": reference_cost,
+        "degradation": degradation,
+        "needs_full_solve": needs_full_solve,
+        "routes": repair.result_routes(),
+        "changes": {
+            "inserted": inserted,
+            "removed": removed,
+            "repriced": repriced,
+            "unplaced": [evaluator.nodes[k] for k in failed],
+            "relocations": moves,
+        },
+        "violations": evaluation["violations"],
+    }
+
+
+def precheck_mdvrp_job(depots, customers, vehicles, cost_matrix=None, distance_mode=None, max_arcs=None):
+    """
+    Feasibility diagnostics and a lower bound for an MDVRP instance, built
+    from the same inputs as solve_mdvrp_job. Cheap enough to run inline, except
+    in road mode, where the road graph has to be loaded.
+    """
+    from utilities import build_vehicles_dict
+    from distance_engine import build_node_matrix, node_matrix_from_cost
+    from models.evaluation import RouteEvaluator
+    from models.precheck import precheck
+
+    depot_names = [d["depot_name"].strip() for d in depots]
+    customer_names = [c["customer_name"].strip() for c in customers]
+    demands = {c["customer_name"].strip(): c["demand"] for c in customers}
+
+    if distance_mode is not None:
+        node_matrix = build_node_matrix(depots, customers, distance_mode)
+    else:
+        node_matrix = node_matrix_from_cost(depots, customers, cost_matrix)
+    evaluator = RouteEvaluator(
+        depot_names, customer_names, node_matrix, demands, build_vehicles_dict(vehicles, depots)
+    )
+    return precheck(evaluator, max_arcs=max_arcs)
+
+
+def solve_tp_job(cost_matrix, demand, supply):
+    """
+    Solve a transportation problem from the demand/supply dicts built by
+    transform_demand / transform_supply.
+    """
+    from utilities import cost_matrix_rows
+    from models.tp import transportationProblem
+
+    problem = transportationProblem(cost_matrix_rows(cost_matrix), demand, supply)
+    problem.solve()
+    return problem.get_solution_json()
+
+
+# ---------------- API side ---------------- #
+
+class SolverPool:
+    """
+    Pool of long-lived solver processes. The API process never imports pulp
+    and only loads numpy for millisecond jobs it runs inline (repairs);
+    solves are sent to workers that imported the solver stack once at
+    start-up. Workers are spawned (not forked) so they do not inherit the
+    Flask process' threads or sqlite connection.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def warm(self, background=True):
+        """
+        Start every worker and wait until each has imported the solver stack.
+        With background=True this returns immediately.
+        """
+        def start():
+            started = time.perf_counter()
+            executor = self._get_executor()
+            pids = {f.result() for f in [executor.submit(_worker_pid) for _ in range(self.workers)]}
+            print(f"Solver pool ready: {len(pids)} worker(s) in {time.perf_counter() - started:.2f}s")
+
+        if background:
+            threading.Thread(target=start, name="solver-pool-warmup", daemon=True).start()
+        else:
+            start()
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn, *args):
+        """
+        Queue fn(*args) on a worker and return its Future. An executor broken
+        by a crashed worker is replaced first.
+        """
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            return self._get_executor().submit(fn, *args)
+
+    def run(self, fn, *args, timeout=None):
+        """
+        Run fn(*args) in a worker and return its result. A crashed worker
+        breaks the executor; it is replaced so later jobs still run.
+        """
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args).result(timeout=timeout)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,43 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# The modules of Optimization/ import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SAMPLE_DB = os.path.join(os.path.dirname(__file__), "../../data/data.db")
+
+
+@pytest.fixture
+def sample_db(tmp_path):
+    """
+    DataHandler on a copy of the sample database.
+    """
+    from data_handler import DataHandler
+
+    path = tmp_path / "data.db"
+    shutil.copy(SAMPLE_DB, path)
+    db = DataHandler(str(path))
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """
+    The app module, serving a copy of the sample database.
+    """
+    path = tmp_path_factory.mktemp("api") / "data.db"
+    shutil.copy(SAMPLE_DB, path)
+    os.environ["DATABASE_PATH"] = str(path)
+    import app
+
+    yield app
+    app.solver_pool.shutdown()
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
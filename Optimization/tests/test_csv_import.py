@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from csv_import import import_scenario, read_csv_chunks
+from scenario_repository import scenario_from_rows
+
+DEPOTS = "DepotID,DepotName,Latitude,Longitude\nA,North,51.0,4.0\nB,South,50.0,4.5\n"
+CUSTOMERS = "CustomerID,X,Y,Demand\n" + "".join(f"{k},50.{k},4.{k},{k}\n" for k in range(1, 8))
+
+
+def test_read_csv_chunks():
+    chunks = list(read_csv_chunks(io.StringIO(CUSTOMERS), "customers", chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_chunk_size_below_one_is_rejected(chunk_size):
+    with pytest.raises(ValueError):
+        next(read_csv_chunks(io.StringIO(CUSTOMERS), "customers", chunk_size=chunk_size))
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(ValueError, match="Demand"):
+        next(read_csv_chunks(io.StringIO("CustomerID,X,Y\n1,2,3\n"), "customers"))
+
+
+def test_import_scenario(sample_db):
+    vehicles = "VehicleID,Capacity,DepotID\n1,100,B\n2,80,\n3,60,\n"
+    result = import_scenario(sample_db, "imported", io.StringIO(DEPOTS), io.StringIO(CUSTOMERS),
+                             io.StringIO(vehicles), chunk_size=2, report=None)
+
+    scenario = scenario_from_rows(sample_db.get_scenario_rows(result["id"]))
+    assert {t: s["rows"] for t, s in result["tables"].items()} == {"depots": 2, "customers": 7, "vehicles": 3}
+    assert [c.customer_name for c in scenario.customers] == [f"Customer {k}" for k in range(1, 8)]
+    depot_ids = {d.depot_name: d.id for d in scenario.depots}
+    # Explicit DepotID first, then round-robin over the imported depots
+    assert [v.depot_id for v in scenario.vehicles] == [depot_ids["South"], depot_ids["North"], depot_ids["South"]]
+
+
+def test_failed_import_is_removed(sample_db):
+    scenarios = len(sample_db.get_all("scenarios"))
+    vehicles = "VehicleID,Capacity,DepotID\n1,100,Z\n"
+
+    with pytest.raises(ValueError, match="unknown DepotID"):
+        import_scenario(sample_db, "broken", io.StringIO(DEPOTS), io.StringIO(CUSTOMERS),
+                        io.StringIO(vehicles), report=None)
+
+    assert len(sample_db.get_all("scenarios")) == scenarios
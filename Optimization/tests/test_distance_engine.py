@@ -0,0 +1,100 @@
+import heapq
+
+import numpy as np
+import pytest
+
+from distance_engine import ContractionHierarchy, RoadNetwork, build_index
+
+
+def random_graph(n=120, extra_edges=360, seed=0):
+    """
+    Connected directed graph: a two-way path through all nodes plus random
+    one-way edges.
+    """
+    rng = np.random.default_rng(seed)
+    path = rng.permutation(n)
+    edge_from = np.concatenate([path[:-1], path[1:], rng.integers(0, n, extra_edges)])
+    edge_to = np.concatenate([path[1:], path[:-1], rng.integers(0, n, extra_edges)])
+    edge_weight = rng.uniform(1.0, 100.0, len(edge_from))
+    return n, edge_from, edge_to, edge_weight
+
+
+def dijkstra(n, edge_from, edge_to, edge_weight, source):
+    adjacency = [[] for _ in range(n)]
+    for u, v, w in zip(edge_from, edge_to, edge_weight):
+        adjacency[u].append((v, w))
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v, w in adjacency[u]:
+            if d + w < dist[v]:
+                dist[v] = d + w
+                heapq.heappush(heap, (d + w, v))
+    return dist
+
+
+def test_ch_matches_dijkstra():
+    n, edge_from, edge_to, edge_weight = random_graph()
+    ch = ContractionHierarchy.build(n, edge_from, edge_to, edge_weight, report=None)
+
+    sources = np.arange(0, n, 7)
+    matrix = ch.many_to_many(sources, np.arange(n))
+
+    expected = np.array([dijkstra(n, edge_from, edge_to, edge_weight, s) for s in sources])
+    np.testing.assert_allclose(matrix, expected, rtol=1e-9)
+
+
+def test_ch_save_and_load(tmp_path):
+    n, edge_from, edge_to, edge_weight = random_graph(n=40, extra_edges=80)
+    ch = ContractionHierarchy.build(n, edge_from, edge_to, edge_weight, report=None)
+    path = str(tmp_path / "graph.ch.npz")
+
+    ch.save(path)
+    loaded = ContractionHierarchy.load(path)
+
+    nodes = np.arange(n)
+    np.testing.assert_array_equal(loaded.many_to_many(nodes, nodes), ch.many_to_many(nodes, nodes))
+    assert [p.name for p in tmp_path.iterdir()] == ["graph.ch.npz"]
+
+
+def write_graph(path, lat, lon):
+    n = len(lat)
+    edge_from = np.arange(n)
+    np.savez(path, node_lat=np.asarray(lat, dtype=float), node_lon=np.asarray(lon, dtype=float),
+             edge_from=edge_from, edge_to=(edge_from + 1) % n, edge_weight=np.ones(n))
+
+
+def test_road_network_requires_index(tmp_path):
+    path = str(tmp_path / "graph.npz")
+    write_graph(path, [0.0, 1.0], [0.0, 1.0])
+
+    with pytest.raises(ValueError):
+        RoadNetwork(path)
+    build_index(path, report=None)
+    RoadNetwork(path)
+
+
+def test_snap_finds_nearest_outside_first_band(tmp_path):
+    path = str(tmp_path / "graph.npz")
+    write_graph(path, [0.0, 0.0, 0.06], [10.0, -10.0, 0.0])
+    build_index(path, report=None)
+
+    nodes, offsets = RoadNetwork(path).snap(np.array([0.0]), np.array([0.0]))
+
+    assert nodes[0] == 2
+    assert offsets[0] == pytest.approx(6672, rel=1e-3)
+
+
+def test_repeated_queries_reuse_the_search_graphs():
+    n, edge_from, edge_to, edge_weight = random_graph(n=30, extra_edges=60)
+    ch = ContractionHierarchy.build(n, edge_from, edge_to, edge_weight, report=None)
+    graphs = (ch._search_fwd, ch._search_bwd)
+
+    nodes = np.arange(n)
+    np.testing.assert_array_equal(ch.many_to_many(nodes, nodes), ch.many_to_many(nodes, nodes))
+    assert (ch._search_fwd, ch._search_bwd) == graphs
+    assert ch._search_fwd[0] is graphs[0][0]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from solver_pool import repair_mdvrp_job
+
+SCENARIO_ID = 20250821111332
+
+
+@pytest.fixture
+def added_customer(api, client):
+    """
+    A stored planar plan of the sample scenario, then one customer more.
+    """
+    assert client.post(f"/mdvrp?scenario_id={SCENARIO_ID}").status_code == 200
+    customer = client.post("/customers", json={"scenario_id": SCENARIO_ID, "customer_name": "Mechelen",
+                                               "customer_x": 51.03, "customer_y": 4.48, "demand": 5}).json
+    yield customer
+    client.delete("/customers", json={"customer_id": customer["id"]})
+
+
+def test_repair_with_binary_matrix(api, client, added_customer):
+    scenario = api.scenario_repo.get(SCENARIO_ID)
+    shape = (len(scenario.depots), len(scenario.customers))
+
+    response = client.post(f"/mdvrp/incremental?scenario_id={SCENARIO_ID}",
+                           data=np.full(shape, 50000.0).tobytes(), content_type="application/octet-stream",
+                           headers={"X-Matrix-Shape": f"{shape[0]},{shape[1]}"})
+
+    assert response.status_code == 200, response.json
+    assert "Mechelen" in response.json["changes"]["inserted"]
+
+
+def test_road_repair_runs_on_the_pool(api, client, added_customer, monkeypatch):
+    jobs = []
+
+    def run_solver(fn, *args, timeout=None):
+        jobs.append(fn)
+        return {"status": "Repaired", "total_cost": 1.0, "needs_full_solve": False, "routes": []}
+
+    monkeypatch.setattr(api, "run_solver", run_solver)
+    response = client.post("/mdvrp/incremental", json={"scenario_id": SCENARIO_ID, "distanceMode": "road"})
+
+    assert response.status_code == 200, response.json
+    assert jobs == [repair_mdvrp_job]
@@ -0,0 +1,110 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from matrix_io import matrix_from_buffer, matrix_from_npy, matrix_shape_error, parse_shape
+from solver_pool import solve_mdvrp_job, solve_tp_job
+from utilities import INF_REPLACE, cost_matrix_rows
+
+MATRIX = np.array([[1.5, 2.0, np.nan], [4.0, 5.25, 6.0]])
+
+
+def npy_bytes(matrix, fortran=False):
+    buf = io.BytesIO()
+    np.save(buf, np.asfortranarray(matrix) if fortran else matrix)
+    return buf.getvalue()
+
+
+def test_parse_shape():
+    assert parse_shape("2,3") == (2, 3)
+    assert parse_shape("2x3") == (2, 3)
+    with pytest.raises(ValueError):
+        parse_shape("6")
+
+
+@pytest.mark.parametrize("dtype,code", [("float32", "<f4"), ("float64", "<f8")])
+def test_matrix_from_buffer(dtype, code):
+    matrix = matrix_from_buffer(MATRIX.astype(code).tobytes(), (2, 3), dtype)
+
+    assert matrix.dtype == np.dtype(code)
+    np.testing.assert_array_equal(matrix, MATRIX.astype(code))
+
+
+def test_matrix_from_buffer_checks_size():
+    with pytest.raises(ValueError):
+        matrix_from_buffer(MATRIX.tobytes(), (3, 3), "float64")
+    with pytest.raises(ValueError):
+        matrix_from_buffer(MATRIX.tobytes(), (2, 3), "int64")
+
+
+@pytest.mark.parametrize("code", ["<f4", "<f8"])
+@pytest.mark.parametrize("fortran", [False, True])
+def test_matrix_from_npy(code, fortran):
+    matrix = matrix_from_npy(npy_bytes(MATRIX.astype(code), fortran))
+    np.testing.assert_array_equal(matrix, MATRIX.astype(code))
+
+
+def test_matrix_from_npy_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        matrix_from_npy(npy_bytes(np.zeros((2, 2), dtype=np.int64)))
+
+
+@pytest.mark.parametrize("code", ["<f4", "<f8"])
+def test_cost_matrix_rows_gives_float64(code):
+    rows = cost_matrix_rows(MATRIX.astype(code))
+
+    assert rows.dtype == np.float64
+    assert rows[0][2] == INF_REPLACE
+    assert type(rows[1][1].item()) is float
+
+
+@pytest.mark.parametrize("code", ["<f4", "<f8"])
+def test_binary_matrices_solve_to_json(code):
+    cost = np.frombuffer(np.array([[4.0, 6.0], [5.0, 3.0]]).astype(code).tobytes(), dtype=code).reshape(2, 2)
+
+    tp = solve_tp_job(cost, {"C1": 10, "C2": 10}, {"D1": 15, "D2": 15})
+    assert json.loads(json.dumps(tp))["total_cost"] == 70
+
+    depots = [{"id": 1, "depot_name": "D1", "depot_x": 51.0, "depot_y": 4.0},
+              {"id": 2, "depot_name": "D2", "depot_x": 50.0, "depot_y": 4.5}]
+    customers = [{"customer_name": "C1", "customer_x": 50.9, "customer_y": 4.1, "demand": 3},
+                 {"customer_name": "C2", "customer_x": 50.1, "customer_y": 4.4, "demand": 4}]
+    vehicles = [{"id": 7, "capacity": 10, "depot_id": 1}, {"id": 8, "capacity": 10, "depot_id": 2}]
+    mdvrp = solve_mdvrp_job(depots, customers, vehicles, cost)
+    assert json.loads(json.dumps(mdvrp))["total_cost"] == 4 + 4 + 3 + 3
+
+
+def test_octet_stream_upload_to_solvetp(api, client):
+    scenario_id = 20250821111332
+    scenario = api.scenario_repo.get(scenario_id)
+    shape = (len(scenario.depots), len(scenario.customers))
+    body = np.full(shape, 1000.0, dtype="<f4").tobytes()
+
+    response = client.post(f"/solvetp?scenario_id={scenario_id}", data=body,
+                           content_type="application/octet-stream",
+                           headers={"X-Matrix-Shape": f"{shape[0]},{shape[1]}", "X-Matrix-Dtype": "float32"})
+
+    assert response.status_code == 200, response.json
+
+
+def test_matrix_shape_error():
+    assert matrix_shape_error([[1, 2, 3], [4, 5, 6]], 2, 3) is None
+    assert matrix_shape_error(MATRIX, 2, 3) is None
+    assert "got 2x4" in matrix_shape_error(np.zeros((2, 4)), 2, 3)
+    assert "different lengths" in matrix_shape_error([[1, 2, 3], [4, 5]], 2, 3)
+    assert matrix_shape_error([], 0, 4) is None
+
+
+@pytest.mark.parametrize("extra", [1, -1])
+def test_mdvrp_rejects_wrong_matrix_shape(api, client, extra):
+    scenario_id = 20250821111332
+    scenario = api.scenario_repo.get(scenario_id)
+    matrix = np.ones((len(scenario.depots), len(scenario.customers) + extra))
+
+    upload = {"costMatrix": (io.BytesIO(npy_bytes(matrix)), "m.npy")}
+    response = client.post(f"/mdvrp?scenario_id={scenario_id}", data=upload, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert "costMatrix must be" in response.json["error"]
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import models.MDVRP
+import models.tp
+from models.MDVRP import MDVRPHeterogeneous
+from models.evaluation import RouteEvaluator
+from models.tp import transportationProblem
+
+DEPOTS = ["D1", "D2"]
+CUSTOMERS = ["C1", "C2", "C3", "C4", "C5"]
+VEHICLES = {"1": {"capacity": 12, "depot": "D1"}, "2": {"capacity": 9, "depot": "D1"},
+            "3": {"capacity": 12, "depot": "D2"}}
+
+
+def instance(seed):
+    """
+    Same structure, distances and demands drawn from `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 100, (len(DEPOTS) + len(CUSTOMERS), 2))
+    distance = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    distance[:len(DEPOTS), :len(DEPOTS)] = 1e12
+    np.fill_diagonal(distance, 0.0)
+    nodes = DEPOTS + CUSTOMERS
+    matrix = {(i, j): float(distance[a, b]) for a, i in enumerate(nodes) for b, j in enumerate(nodes)}
+    demands = {c: int(d) for c, d in zip(CUSTOMERS, rng.integers(1, 7, len(CUSTOMERS)))}
+    return matrix, demands
+
+
+def solve_mdvrp(seed):
+    matrix, demands = instance(seed)
+    result = MDVRPHeterogeneous(matrix, DEPOTS, CUSTOMERS, demands, VEHICLES).solve()
+    evaluation = RouteEvaluator.from_distance_dict(DEPOTS, CUSTOMERS, matrix, demands, VEHICLES).evaluate(result["routes"])
+    return result, evaluation
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_reused_mdvrp_model_matches_fresh_build(seed):
+    models.MDVRP._model_cache.clear()
+    fresh, _ = solve_mdvrp(seed)
+
+    models.MDVRP._model_cache.clear()
+    solve_mdvrp(seed + 100)
+    assert len(models.MDVRP._model_cache) == 1
+    reused, evaluation = solve_mdvrp(seed)
+
+    assert reused["status"] == fresh["status"] == "Optimal"
+    assert reused["total_cost"] == pytest.approx(fresh["total_cost"])
+    assert evaluation["feasible"], evaluation["violations"]
+    assert evaluation["total_cost"] == pytest.approx(reused["total_cost"])
+
+
+def test_duplicate_node_names_solve():
+    depots = ["D1", "D1"]
+    matrix, demands = instance(4)
+    matrix.update({("D1", j): matrix[("D2", j)] for j in CUSTOMERS})
+    matrix.update({(i, "D1"): matrix[(i, "D2")] for i in CUSTOMERS})
+    vehicles = {"1": {"capacity": 20, "depot": "D1"}, "2": {"capacity": 20, "depot": "D1"}}
+
+    models.MDVRP._model_cache.clear()
+    result = MDVRPHeterogeneous(matrix, depots, CUSTOMERS, demands, vehicles).solve()
+
+    assert result["status"] == "Optimal"
+    assert sorted(c for r in result["routes"] for c in r["route"][1:-1]) == CUSTOMERS
+
+
+def test_reused_tp_model_matches_fresh_build():
+    def solve(costs, demand, supply):
+        problem = transportationProblem(costs, demand, supply)
+        problem.solve()
+        return problem.get_solution_json()
+
+    first = ([[4, 6, 9], [5, 3, 8]], {"A": 10, "B": 12, "C": 5}, {"X": 15, "Y": 15})
+    second = ([[7, 2, 3], [1, 9, 4]], {"A": 8, "B": 6, "C": 11}, {"X": 14, "Y": 20})
+
+    models.tp._model_cache.clear()
+    fresh = solve(*second)
+    models.tp._model_cache.clear()
+    solve(*first)
+    reused = solve(*second)
+
+    assert reused["total_cost"] == fresh["total_cost"]
+    assert reused["shipments"] == fresh["shipments"]
+
+
+def test_sample_scenario_with_duplicate_depot_names(client):
+    response = client.post("/mdvrp?scenario_id=20250821111334")
+    assert response.status_code == 200, response.json
+    assert response.json["status"] == "Optimal"
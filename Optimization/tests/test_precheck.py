@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from models.MDVRP import MDVRPHeterogeneous
+from models.evaluation import RouteEvaluator
+from models.precheck import min_vehicles, precheck
+from utilities import INF_REPLACE
+
+DEPOTS = ["D1", "D2"]
+CUSTOMERS = ["C1", "C2", "C3", "C4"]
+
+
+def make_instance(seed=0, demands=(3, 4, 2, 5), capacities=(8, 8)):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 100, (len(DEPOTS) + len(CUSTOMERS), 2))
+    distance = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    distance[:len(DEPOTS), :len(DEPOTS)] = INF_REPLACE
+    np.fill_diagonal(distance, 0.0)
+    vehicles = {str(k): {"capacity": c, "depot": DEPOTS[k % 2]} for k, c in enumerate(capacities)}
+    return distance, dict(zip(CUSTOMERS, demands)), vehicles
+
+
+def test_min_vehicles():
+    assert min_vehicles([5, 10, 3], 12) == 2
+    assert min_vehicles([5, 10, 3], 0) == 0
+    assert min_vehicles([5, 10, 3], 19) is None
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_lower_bound_does_not_exceed_optimum(seed):
+    distance, demands, vehicles = make_instance(seed)
+    nodes = DEPOTS + CUSTOMERS
+    matrix = {(i, j): float(distance[a, b]) for a, i in enumerate(nodes) for b, j in enumerate(nodes)}
+
+    result = precheck(RouteEvaluator(DEPOTS, CUSTOMERS, distance, demands, vehicles))
+    optimum = MDVRPHeterogeneous(matrix, DEPOTS, CUSTOMERS, demands, vehicles).solve()
+
+    assert result["feasible"] and result["recommendation"] == "solve"
+    assert result["min_vehicles"] == 2
+    assert 0 < result["lower_bound"] <= optimum["total_cost"] + 1e-6
+
+
+def test_capacity_issues():
+    distance, demands, vehicles = make_instance(demands=(3, 9, 2, 5))
+
+    result = precheck(RouteEvaluator(DEPOTS, CUSTOMERS, distance, demands, vehicles))
+
+    assert not result["feasible"]
+    assert result["recommendation"] == "reject"
+    assert result["oversized_customers"] == ["C2"]
+    assert result["lower_bound"] is None
+    assert any("exceeds fleet capacity" in issue for issue in result["issues"])
+
+
+def test_unreachable_customer():
+    distance, demands, vehicles = make_instance()
+    distance[:, 3] = INF_REPLACE
+    distance[3, 3] = 0.0
+
+    result = precheck(RouteEvaluator(DEPOTS, CUSTOMERS, distance, demands, vehicles))
+
+    assert result["unreachable_customers"] == ["C2"]
+    assert not result["feasible"]
+
+
+def test_large_models_are_sent_to_a_heuristic():
+    distance, demands, vehicles = make_instance()
+
+    result = precheck(RouteEvaluator(DEPOTS, CUSTOMERS, distance, demands, vehicles), max_arcs=10)
+
+    assert result["model_arcs"] == 2 * 4 * 5
+    assert result["recommendation"] == "heuristic"
@@ -0,0 +1,78 @@
+import numpy as np
+
+from models.evaluation import RouteEvaluator
+from models.repair import RouteRepair
+
+
+def make_evaluator(customers, demands, capacity=10):
+    """
+    Two depots at x=0 and x=100 with one vehicle each; customers on the x
+    axis at the given positions, distances |x_i - x_j|.
+    """
+    x = np.array([0.0, 100.0] + [p for _, p in customers])
+    distance = np.abs(x[:, None] - x[None, :])
+    vehicles = {"1": {"capacity": capacity, "depot": "D1"}, "2": {"capacity": capacity, "depot": "D2"}}
+    return RouteEvaluator(["D1", "D2"], [c for c, _ in customers], distance, demands, vehicles)
+
+
+PLAN = [
+    {"vehicle": "1", "route": ["D1", "A", "B", "D1"]},
+    {"vehicle": "2", "route": ["D2", "C", "D2"]},
+]
+
+
+def test_insert_new_customer_next_to_its_neighbours():
+    ev = make_evaluator([("A", 10), ("B", 20), ("C", 90), ("E", 15)], {"A": 2, "B": 2, "C": 2, "E": 2})
+    repair = RouteRepair(ev)
+    repair.load(PLAN)
+
+    failed = repair.insert_all([ev.index["E"]])
+
+    assert failed == []
+    routes = {r["vehicle"]: r["route"] for r in repair.result_routes()}
+    assert routes["1"] == ["D1", "A", "E", "B", "D1"]
+    assert routes["2"] == ["D2", "C", "D2"]
+    assert repair.evaluate()["feasible"]
+
+
+def test_insert_respects_capacity():
+    ev = make_evaluator([("A", 10), ("B", 20), ("C", 90), ("E", 15)], {"A": 4, "B": 4, "C": 2, "E": 4})
+    repair = RouteRepair(ev)
+    repair.load(PLAN)
+
+    repair.insert_all([ev.index["E"]])
+
+    routes = {r["vehicle"]: r["route"] for r in repair.result_routes()}
+    assert routes["1"] == ["D1", "A", "B", "D1"]
+    assert "E" in routes["2"]
+    assert repair.evaluate()["feasible"]
+
+
+def test_removed_customer_leaves_the_rest_untouched():
+    ev = make_evaluator([("A", 10), ("C", 90)], {"A": 2, "C": 2})
+    repair = RouteRepair(ev)
+    repair.load(PLAN, removed=["B"])
+
+    assert repair.insert_all() == []
+    assert repair.relocate() == 0
+    assert [r["route"] for r in repair.result_routes()] == [["D1", "A", "D1"], ["D2", "C", "D2"]]
+    assert repair.touched == {0}
+    assert repair.evaluate()["total_cost"] == 20 + 20
+
+
+def test_unplaceable_customer_is_reported():
+    ev = make_evaluator([("A", 10), ("B", 20), ("C", 90), ("E", 50)], {"A": 2, "B": 2, "C": 2, "E": 11})
+    repair = RouteRepair(ev)
+    repair.load(PLAN)
+
+    assert repair.insert_all([ev.index["E"]]) == [ev.index["E"]]
+    assert not repair.evaluate()["feasible"]
+
+
+def test_reference_cost_prices_changes_without_capacities():
+    ev = make_evaluator([("A", 10), ("B", 20), ("C", 90), ("E", 15)], {"A": 4, "B": 4, "C": 2, "E": 4})
+    repair = RouteRepair(ev)
+    repair.load(PLAN)
+
+    # Plan costs 40 + 20; E fits between A and B at no extra distance
+    assert repair.reference_cost([ev.index["E"]]) == 60
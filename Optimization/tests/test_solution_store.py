@@ -0,0 +1,78 @@
+import pytest
+
+from scenario_repository import Customer, Depot, Scenario, Vehicle
+from solution_store import decode_routes, encode_routes
+
+
+def make_scenario():
+    scenario = Scenario(1, "test", "2025-01-01")
+    scenario.depots = [Depot(10, 1, "North", 51.0, 4.0, None, None, None),
+                       Depot(11, 1, "South", 50.0, 4.5, None, None, None)]
+    scenario.customers = [Customer(20, 1, "Ghent", 51.05, 3.7, 7),
+                          Customer(21, 1, "Liège", 50.6, 5.6, 3.5),
+                          Customer(22, 1, "Namur", 50.5, 4.9, 4)]
+    scenario.vehicles = [Vehicle(30, 1, 20, 10), Vehicle(31, 1, 15, 11)]
+    return scenario
+
+
+def test_routes_round_trip():
+    scenario = make_scenario()
+    routes = [
+        {"vehicle": "30", "route": ["North", "Ghent", "North"], "capacity": 20},
+        {"vehicle": "31", "route": ["South", "Namur", "Liège", "South"], "capacity": 15},
+    ]
+
+    decoded, demands = decode_routes(scenario, *encode_routes(scenario, routes))
+
+    assert decoded == routes
+    assert demands == {"Ghent": 7, "Liège": 3.5, "Namur": 4}
+
+
+def test_empty_plan_round_trip():
+    scenario = make_scenario()
+    assert decode_routes(scenario, *encode_routes(scenario, [])) == ([], {})
+
+
+def test_deleted_rows_are_named_by_id():
+    scenario = make_scenario()
+    blobs = encode_routes(scenario, [{"vehicle": "30", "route": ["North", "Ghent", "North"]}])
+    scenario.customers = scenario.customers[1:]
+
+    routes, demands = decode_routes(scenario, *blobs)
+
+    assert routes[0]["route"] == ["North", "customer 20", "North"]
+    assert demands == {"customer 20": 7}
+
+
+def test_unknown_stop_is_rejected():
+    with pytest.raises(ValueError):
+        encode_routes(make_scenario(), [{"vehicle": "30", "route": ["North", "Bruges", "North"]}])
+
+
+def test_cost_matrix_is_stored_once_per_input_hash(sample_db):
+    import numpy as np
+    from scenario_repository import scenario_from_rows
+    from solution_store import SolutionStore
+
+    store = SolutionStore(sample_db)
+    scenario = scenario_from_rows(sample_db.get_scenario_rows(20250821111332))
+    depot, customer = scenario.depots[0].depot_name.strip(), scenario.customers[0].customer_name.strip()
+    result = {"status": "Optimal", "total_cost": 12.5,
+              "routes": [{"vehicle": str(scenario.vehicles[0].id), "route": [depot, customer, depot]}]}
+    matrix = [[float(i * 10 + j) for j in range(len(scenario.customers))] for i in range(len(scenario.depots))]
+    matrix[0][1] = None
+
+    for _ in range(2):
+        store.save(scenario, "mdvrp", result, "full", cost_matrix=matrix, input_hash="abc")
+    assert len(sample_db.get_all("cost_matrices")) == 1
+
+    latest = store.latest(scenario)
+    assert "cost_matrix" not in latest
+    assert latest["routes"][0]["route"] == [depot, customer, depot]
+    stored = store.cost_matrix(latest)
+    assert stored.shape == (len(matrix), len(matrix[0]))
+    assert stored[0][1] == 1e12
+    np.testing.assert_array_equal(stored[1], matrix[1])
+
+    store.delete_for_scenario(scenario.id)
+    assert sample_db.get_all("cost_matrices") == []
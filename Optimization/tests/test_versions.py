@@ -0,0 +1,48 @@
+from data_handler import SCENARIO_LIST_KEY
+
+SCENARIO_ID = 20250821111332
+
+
+def test_row_changes_bump_their_scenario_only(sample_db):
+    other = 20250821111335
+    before, other_before = sample_db.get_version(SCENARIO_ID), sample_db.get_version(other)
+
+    customer_id = sample_db.insert("customers", [None, SCENARIO_ID, "Mechelen", 51.03, 4.48, 20])
+    sample_db.update_by_id("customers", customer_id, "demand", 25)
+    sample_db.delete_by_id("customers", customer_id)
+
+    assert sample_db.get_version(SCENARIO_ID) == before + 3
+    assert sample_db.get_version(other) == other_before
+
+
+def test_scenario_rows_bump_the_list(sample_db):
+    before = sample_db.get_version(SCENARIO_LIST_KEY)
+    scenario_id = sample_db.insert("scenarios", [None, "new", "2025-01-01"])
+
+    assert sample_db.get_version(SCENARIO_LIST_KEY) == before + 1
+    sample_db.update_by_id("scenarios", scenario_id, "name", "renamed")
+    assert sample_db.get_version(SCENARIO_LIST_KEY) == before + 2
+    assert sample_db.get_version(scenario_id) == 2
+
+
+def test_scenario_read_answers_304_until_it_changes(client):
+    url = f"/scenarios_by_id?scenario_id={SCENARIO_ID}"
+    first = client.get(url)
+    etag = first.headers["ETag"]
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    customer = client.post("/customers", json={"scenario_id": SCENARIO_ID, "customer_name": "Mechelen",
+                                               "customer_x": 51.03, "customer_y": 4.48, "demand": 20}).json
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "Mechelen" in [c["customer_name"] for c in changed.json["customers"]]
+    client.delete("/customers", json={"customer_id": customer["id"]})
+
+
+def test_scenario_list_etag(client):
+    etag = client.get("/scenarios").headers["ETag"]
+    assert client.get("/scenarios", headers={"If-None-Match": etag}).status_code == 304
@@ -1,5 +1,10 @@
 import math 
 
+from matrix_io import matrix_shape_error
+
+# Distance used for unknown (None / NaN) or forbidden arcs
+INF_REPLACE = 1e12
+
 def clean_name(name):
     """
     Remove leading and trailing whitespace from a string.
@@ -30,6 +35,20 @@ def build_demands(customers):
     
     return {clean_name(c["customer_name"]): c["demand"] for c in customers}
 
+def customer_row_to_dict(row):
+    """
+    Convert a customers table row (id, scenario_id, customer_name, customer_x,
+    customer_y, demand) into the JSON shape used by the API.
+    """
+    return {
+        "id": row[0],
+        "scenario_id": row[1],
+        "customer_name": row[2],
+        "customer_x": row[3],
+        "customer_y": row[4],
+        "demand": row[5]
+    }
+
 def build_vehicles_dict(vehicles, depots):
     """
     vehicles: list of dicts like {'id': 'V1', 'capacity': 100, 'depot_id': 1}
@@ -52,15 +71,50 @@ def build_vehicles_dict(vehicles, depots):
     return veh_dict
 
 
+def planar_distance(x1, y1, x2, y2):
+    """
+    Approximate distance in metres between two coordinate pairs given in
+    degrees, treating them as planar (one degree ~ 111 km).
+    """
+    return math.hypot(x1 - x2, y1 - y2) * 111000
+
+
+def cost_matrix_rows(cost_matrix):
+    """
+    Return the cost matrix with missing entries (None in JSON, NaN in binary
+    uploads) replaced by INF_REPLACE, indexable as matrix[i][j].
+    Nested lists come back as lists. A 2D numpy array stays an array, so
+    zero-copy uploads are not expanded into Python lists; it is copied only
+    to widen float32 to float64 (whose entries are Python floats to pulp and
+    JSON) or to replace NaNs.
+    """
+    if hasattr(cost_matrix, "dtype"):
+        import numpy as np
+        cost_matrix = np.asarray(cost_matrix, dtype=np.float64)
+        missing = np.isnan(cost_matrix)
+        if missing.any():
+            return np.where(missing, INF_REPLACE, cost_matrix)
+        return cost_matrix
+
+    return [
+        [INF_REPLACE if val is None or val != val else val for val in row]
+        for row in cost_matrix
+    ]
+
+
 def build_distance_matrix(depots, customers, cost_matrix):
     """
     Build a distance dictionary from depot/customer names using a precomputed cost_matrix.
     depots: list of dicts with 'depot_name'
     customers: list of dicts with 'customer_name'
-    cost_matrix: 2D array of distances from depots to customers (rows=depots, cols=customers)
+    cost_matrix: 2D array of distances from depots to customers (rows=depots, cols=customers),
+                 as nested lists or a numpy array; None / NaN mark missing distances
     """
-    INF_REPLACE = 1e12
+    shape_error = matrix_shape_error(cost_matrix, len(depots), len(customers))
+    if shape_error:
+        raise ValueError(shape_error)
     dist = {}
+    cost_matrix = cost_matrix_rows(cost_matrix)
 
     depot_names = [d["depot_name"].strip() for d in depots]
     customer_names = [c["customer_name"].strip() for c in customers]
@@ -74,8 +128,8 @@ def build_distance_matrix(depots, customers, cost_matrix):
     for i, depot in enumerate(depot_names):
         for j, customer in enumerate(customer_names):
             val = cost_matrix[i][j]
-            dist[(depot, customer)] = val if val is not None else INF_REPLACE
-            dist[(customer, depot)] = val if val is not None else INF_REPLACE
+            dist[(depot, customer)] = val
+            dist[(customer, depot)] = val
 
     # customer -> customer distances (Euclidean fallback)
     for c1 in customers:
@@ -85,11 +139,36 @@ def build_distance_matrix(depots, customers, cost_matrix):
             if name1 == name2:
                 dist[(name1, name2)] = 0
             else:
-                dist[(name1, name2)] = math.hypot(
-                    c1["customer_x"] - c2["customer_x"],
-                    c1["customer_y"] - c2["customer_y"]
-                ) * 111000
+                dist[(name1, name2)] = planar_distance(
+                    c1["customer_x"], c1["customer_y"],
+                    c2["customer_x"], c2["customer_y"]
+                )
+
+    return dist
+
 
+def distance_dict_from_matrix(depots, customers, node_matrix):
+    """
+    Build the same distance dictionary as build_distance_matrix from a full
+    node matrix over depots + customers (e.g. from distance_engine).
+    Depot -> depot moves stay forbidden; non-finite entries become INF_REPLACE.
+    """
+    names = [d["depot_name"].strip() for d in depots] + [c["customer_name"].strip() for c in customers]
+    n_depots = len(depots)
+
+    import numpy as np
+    rows = np.where(np.isfinite(node_matrix), node_matrix, INF_REPLACE).tolist()
+
+    dist = {}
+    for i, ni in enumerate(names):
+        row = rows[i]
+        for j, nj in enumerate(names):
+            if i == j:
+                dist[(ni, nj)] = 0
+            elif i < n_depots and j < n_depots:
+                dist[(ni, nj)] = INF_REPLACE
+            else:
+                dist[(ni, nj)] = row[j]
     return dist
 
 